@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Çıkarıcı (extractor) fonksiyonları için ağsız benchmark
+
+benchmarks/corpus/ altındaki kayıtlı Technopolis ve TechnoMarket sayfaları geçici
+bir HTTP önbelleğine yüklenir ve scraper'lar çevrimdışı modda (SCRAPER_OFFLINE=1)
+gerçek fonksiyonlarıyla çalıştırılır. Her benchmark ayrı bir süreçte koşar,
+böylece tepe RSS değeri diğerlerinden etkilenmez.
+
+Ölçülenler: sayfa/saniye, p50/p99 gecikme (ms), tepe RSS (KB)
+
+Kullanım:
+    python benchmarks/bench_parsers.py                       # JSON'u ekrana yazar
+    python benchmarks/bench_parsers.py -o bench.json         # dosyaya yazar
+    python benchmarks/bench_parsers.py --compare eski.json   # önceki sonuçla karşılaştırır
+    python benchmarks/bench_parsers.py extract_product_urls@stream   # belirli HTML parser backend'i
+
+"ad@backend" biçimindeki benchmark'lar SCRAPER_HTML_PARSER=backend ile koşar
+(bkz. common/html_parser.py); varsayılan listede kurulu her backend için
+grid ve ürün sayfası varyantları bulunur.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+CORPUS_DIR = os.path.join(BENCH_DIR, 'corpus')
+CORPUS_INDEX = os.path.join(CORPUS_DIR, 'index.json')
+
+# Ayarlar
+ITERATIONS = 30  # Her sayfa için tekrar sayısı
+WARMUP = 3  # Ölçüme dahil edilmeyen ilk çalıştırmalar
+
+# get_images_from_url sonrası convert_to_full_size_image'e giden tipik URL'ler
+THUMBNAIL_URLS = [
+    'https://api.technopolis.bg/medias/833879-1-71x71/thumb/product.jpg?w=71&h=71',
+    'https://www.technopolis.bg/medias/100x100/833877_small.jpg',
+    'https://cdn.technopolis.bg/images/thumbnails/502850_thumb.png?size=200',
+    'https://www.technopolis.bg/medias/833879-big.jpg',
+    'https://www.technomarket.bg/medias/tm-09218598_71x71_1.jpg?width=100&height=100',
+]
+
+
+def load_corpus():
+    with open(CORPUS_INDEX, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    pages = []
+    for filename, info in index.items():
+        with open(os.path.join(CORPUS_DIR, filename), 'rb') as f:
+            pages.append(dict(info, file=filename, content=f.read()))
+    return pages
+
+
+def seed_cache(cache_path, pages):
+    """Korpus sayfalarını URL'leriyle geçici önbelleğe yazar"""
+    from common.http_cache import ResponseCache
+    cache = ResponseCache(cache_path)
+    for page in pages:
+        cache.put(page['url'], 200, {'Content-Type': 'text/html; charset=utf-8'}, page['content'])
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def resolve_target(name):
+    """Benchmark adı -> (fonksiyon, korpus sayfa tipi veya girdi listesi)"""
+    name, _, backend = name.partition('@')
+    if backend:
+        # Modüller import edilmeden önce ayarlanmalı (scrape_images parser'ı import anında seçer)
+        os.environ['SCRAPER_HTML_PARSER'] = backend
+    sys.path.insert(0, REPO_ROOT)
+    sys.path.insert(0, os.path.join(REPO_ROOT, 'technomarket'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        import scrape_images
+        import scrape_technomarket
+        import extract_product_urls
+    targets = {
+        'get_images_from_url': (scrape_images.get_images_from_url, 'technopolis_product'),
+        'convert_to_full_size_image': (scrape_images.convert_to_full_size_image, None),
+        'get_product_details': (scrape_technomarket.get_product_details, 'technomarket_product'),
+        'extract_product_urls': (extract_product_urls.extract_product_urls, 'technomarket_grid'),
+    }
+    return targets[name]
+
+
+def run_benchmark(name, iterations, queue):
+    """Alt süreçte çalışır: fonksiyonu korpus üzerinde koşturup sonuçları kuyruğa koyar"""
+    func, page_type = resolve_target(name)
+    if page_type is None:
+        inputs = THUMBNAIL_URLS
+    else:
+        inputs = [page['url'] for page in load_corpus() if page['type'] == page_type]
+
+    latencies = []
+    results_ok = True
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        for i in range(WARMUP + iterations):
+            for arg in inputs:
+                started = time.perf_counter()
+                result = func(arg)
+                elapsed = time.perf_counter() - started
+                if i >= WARMUP:
+                    latencies.append(elapsed)
+                if not result:
+                    results_ok = False
+
+    total = sum(latencies)
+    queue.put({
+        'pages': len(latencies),
+        'inputs': len(inputs),
+        'pages_per_sec': round(len(latencies) / total, 2) if total else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'non_empty_results': results_ok,
+    })
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old, new):
+    """İki sonuç dosyasını sayfa/saniye üzerinden karşılaştırıp yazdırır"""
+    print(f"\n{'Benchmark':<36}{'eski p/s':>12}{'yeni p/s':>12}{'oran':>8}")
+    for name, result in new['results'].items():
+        before = old.get('results', {}).get(name, {}).get('pages_per_sec')
+        after = result.get('pages_per_sec')
+        ratio = f"{after / before:.2f}x" if before and after else '-'
+        print(f"{name:<36}{before or '-':>12}{after or '-':>12}{ratio:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ağsız çıkarıcı benchmark\'ı')
+    parser.add_argument('-n', '--iterations', type=int, default=ITERATIONS)
+    parser.add_argument('-o', '--output', help='Sonuç JSON dosyası')
+    parser.add_argument('--compare', help='Karşılaştırılacak önceki sonuç JSON dosyası')
+    parser.add_argument('benchmarks', nargs='*', help='Sadece bu benchmark\'ları çalıştır')
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    from common import html_parser
+    names = args.benchmarks or (
+        ['get_images_from_url', 'convert_to_full_size_image', 'get_product_details', 'extract_product_urls']
+        + [f'get_product_details@{backend}' for backend in html_parser.available_backends()
+           if backend in html_parser.SOUP_BACKENDS]
+        + [f'extract_product_urls@{backend}' for backend in html_parser.available_backends()]
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = os.path.join(tmp_dir, 'bench_cache.sqlite')
+        # Alt süreçler bu ortam değişkenlerini devralır: sadece önbellekten okunur, ağ yok
+        os.environ['SCRAPER_CACHE_PATH'] = cache_path
+        os.environ['SCRAPER_OFFLINE'] = '1'
+        os.environ['SCRAPER_CACHE_TTL'] = str(10 * 365 * 24 * 3600)
+        seed_cache(cache_path, load_corpus())
+
+        ctx = multiprocessing.get_context('spawn')
+        results = {}
+        for name in names:
+            queue = ctx.Queue()
+            process = ctx.Process(target=run_benchmark, args=(name, args.iterations, queue))
+            process.start()
+            results[name] = queue.get()
+            process.join()
+            print(f"  {name}: {results[name]['pages_per_sec']} sayfa/s, "
+                  f"p50 {results[name]['p50_ms']} ms, p99 {results[name]['p99_ms']} ms", file=sys.stderr)
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'iterations': args.iterations,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+Technopolis ve TechnoMarket script'lerinin ortak kullandığı yardımcı modüller
+"""
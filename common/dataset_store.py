@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Çalışma veri seti deposu (xlsx yerine)
+
+Scriptler çalışma kitabını her seferinde pd.read_excel / to_excel ile baştan
+okuyup yazıyordu (openpyxl binlerce satırda saniyeler sürer; dosya Excel'de
+açıkken yazmak da sorun). Veri seti artık xlsx dosyasının yanındaki .data/
+klasöründe tutulur:
+    <ad>.parquet    tüm tablo (pyarrow varsa; yoksa <ad>.pkl, pandas pickle)
+Kayıt atomiktir (geçici dosya + os.replace). xlsx sadece açık bir dışa aktarma
+adımıyla üretilir (export_xlsx.py veya DatasetStore.export_xlsx); depo henüz
+yoksa ilk yüklemede mevcut xlsx bir kez içe aktarılır.
+
+Product ID / EAN sütunları yüklemede metne normalize edilir: xlsx'ten sayı,
+kazımadan metin gelir; Parquet sütun başına tek tip ister.
+"""
+
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Ayarlar
+STORE_DIR = os.environ.get('SCRAPER_STORE_DIR', '.data')  # xlsx dosyasının klasörüne göre
+KEY_COLUMNS = ['Product ID', 'Barkod (EAN Number)']  # Metin olarak tutulan kimlik sütunları
+
+
+def _key_value(value):
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip() or None
+
+
+def _normalize_keys(df):
+    """Kimlik sütunlarını metne çevirir (9218598.0 -> '9218598', boş -> None)"""
+    for column in KEY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].map(_key_value).astype(object)
+    return df
+
+
+class DatasetStore:
+    """Tek bir veri setinin (ör. TechnoMarket ürünleri) Parquet deposu"""
+
+    def __init__(self, name, xlsx_path):
+        self.name = name
+        self.xlsx_path = xlsx_path
+        self.directory = os.path.join(os.path.dirname(xlsx_path) or '.', STORE_DIR)
+        extension = 'parquet' if PARQUET_AVAILABLE else 'pkl'
+        self.data_path = os.path.join(self.directory, f'{name}.{extension}')
+
+    def exists(self):
+        return os.path.exists(self.data_path)
+
+    def load(self):
+        """Veri setini DataFrame olarak döndürür (depo yoksa xlsx'ten içe aktarır)"""
+        if not self.exists():
+            if not os.path.exists(self.xlsx_path):
+                raise FileNotFoundError(f"Veri seti bulunamadı: {self.data_path} / {self.xlsx_path}")
+            return self.import_xlsx()
+        if PARQUET_AVAILABLE:
+            return _normalize_keys(pd.read_parquet(self.data_path))
+        return _normalize_keys(pd.read_pickle(self.data_path))
+
+    def save(self, df):
+        """Tabloyu atomik olarak yazar"""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.data_path + '.tmp'
+        if PARQUET_AVAILABLE:
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.reset_index(drop=True).to_pickle(tmp_path)
+        os.replace(tmp_path, self.data_path)
+
+    def import_xlsx(self):
+        """xlsx dosyasını depoya aktarır (mevcut depo verisinin yerine geçer)"""
+        print(f"📥 '{self.xlsx_path}' veri deposuna aktarılıyor ({self.data_path})...")
+        df = _normalize_keys(pd.read_excel(self.xlsx_path))
+        self.save(df)
+        return df
+
+    def export_xlsx(self, path=None):
+        """Depodaki veri setini xlsx olarak yazar (varsayılan: xlsx_path)"""
+        path = path or self.xlsx_path
+        self.load().to_excel(path, index=False)
+        return path
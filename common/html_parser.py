@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+Değiştirilebilir HTML parser katmanı
+
+Backend'ler:
+    html.parser  BeautifulSoup + stdlib parser (her zaman var, en yavaşı)
+    lxml         BeautifulSoup + lxml (kuruluysa)
+    selectolax   selectolax/lexbor (kuruluysa); BeautifulSoup ağacı vermez,
+                 sadece seçici ile kart / link okuma için kullanılır
+    stream       stdlib HTMLParser ile olay tabanlı mod; ağaç kurmadan grid
+                 sayfasındaki tm-product-item kartlarını sırayla üretir
+
+Sayfa tipine göre varsayılanlar PAGE_PARSERS'tadır: kurulu olan ilk backend
+kullanılır; sıra benchmarks/bench_parsers.py sonuçlarına göredir (grid'de
+selectolax > stream > lxml ≈ html.parser, ürün sayfasında lxml > html.parser).
+SCRAPER_HTML_PARSER tüm tipler için,
+SCRAPER_HTML_PARSER_<TIP> (ör. SCRAPER_HTML_PARSER_GRID) tek tip için
+backend'i değiştirir. Kurulu olmayan backend seçilirse html.parser kullanılır.
+"""
+
+import os
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# Ayarlar
+PAGE_PARSERS = {  # Sayfa tipi -> tercih sırasıyla backend'ler
+    'product': ('lxml', 'html.parser'),  # Ürün sayfası: çıkarıcılar BeautifulSoup ağacı kullanır
+    'grid': ('selectolax', 'stream'),  # Grid sayfası: sadece ürün kartları gerekir
+    'page': ('lxml', 'html.parser'),  # Diğer sayfalar (kategori listesi vb.)
+}
+FALLBACK_PARSER = 'html.parser'
+
+SOUP_BACKENDS = ('html.parser', 'lxml')  # BeautifulSoup ağacı veren backend'ler
+GRID_ITEM_TAG = 'tm-product-item'
+VOID_TAGS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                       'link', 'meta', 'source', 'track', 'wbr'])
+
+
+def available_backends():
+    backends = ['html.parser']
+    if LXML_AVAILABLE:
+        backends.append('lxml')
+    if SELECTOLAX_AVAILABLE:
+        backends.append('selectolax')
+    backends.append('stream')
+    return backends
+
+
+def backend_for(page_type='page'):
+    """Sayfa tipi için yapılandırılmış (ve kurulu) backend"""
+    name = os.environ.get(f'SCRAPER_HTML_PARSER_{page_type.upper()}') or os.environ.get('SCRAPER_HTML_PARSER')
+    candidates = (name,) if name else PAGE_PARSERS.get(page_type, ())
+    available = available_backends()
+    return next((candidate for candidate in candidates if candidate in available), FALLBACK_PARSER)
+
+
+def soup_builder(page_type='page'):
+    """BeautifulSoup'a verilecek parser adı (ağaç vermeyen backend seçiliyse en hızlı ağaç kuran)"""
+    name = backend_for(page_type)
+    if name in SOUP_BACKENDS:
+        return name
+    return 'lxml' if LXML_AVAILABLE else FALLBACK_PARSER
+
+
+def make_soup(content, page_type='page'):
+    """İçerikten BeautifulSoup ağacı kurar"""
+    return BeautifulSoup(content, soup_builder(page_type))
+
+
+def _to_text(content):
+    if isinstance(content, bytes):
+        return content.decode('utf-8', errors='replace')
+    return content
+
+
+def _new_item():
+    return {'links': [], 'title': None, 'brand': None, 'price_primary': None, 'price_secondary': None}
+
+
+class GridItemParser(HTMLParser):
+    """Olay tabanlı grid okuyucu: ağaç kurmadan tm-product-item kartlarını toplar
+
+    Her kart için a[href] linkleri, a.title metni, ilk data-brand değeri ve
+    .price tm-price .bgn içindeki .primary / .secondary metinleri alınır;
+    kartların dışında .paging içindeki linkler de toplanır.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.items = []
+        self.paging_links = []
+        self._paging = []  # .paging içindeyken açık etiketler
+        self._item = None
+        self._stack = []  # Kart içindeki açık etiketler: (etiket, bu etikette açılan bağlamlar)
+        self._context = {'price': 0, 'tm-price': 0, 'bgn': 0}
+        self._capture = None  # Metni toplanan alan adı
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == GRID_ITEM_TAG:
+            self._item = _new_item()
+            self._stack = []
+            return
+        if self._item is None:
+            self._paging_starttag(tag, dict(attrs))
+            return
+
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if tag == 'a' and attrs.get('href'):
+            self._item['links'].append(attrs['href'])
+        if self._item['brand'] is None and attrs.get('data-brand') is not None:
+            self._item['brand'] = attrs['data-brand']
+        if tag in VOID_TAGS:
+            return
+
+        opened = []
+        if 'price' in classes:
+            opened.append('price')
+        if tag == 'tm-price' and self._context['price']:
+            opened.append('tm-price')
+        if 'bgn' in classes and self._context['tm-price']:
+            opened.append('bgn')
+        for name in opened:
+            self._context[name] += 1
+
+        capture = None
+        if self._capture is None:
+            if tag == 'a' and 'title' in classes and self._item['title'] is None:
+                capture = 'title'
+            elif self._context['bgn'] and 'primary' in classes and self._item['price_primary'] is None:
+                capture = 'price_primary'
+            elif self._context['bgn'] and 'secondary' in classes and self._item['price_secondary'] is None:
+                capture = 'price_secondary'
+            if capture:
+                self._capture = capture
+                self._text = []
+        self._stack.append((tag, opened, capture))
+
+    def _paging_starttag(self, tag, attrs):
+        if not self._paging and 'paging' not in (attrs.get('class') or '').split():
+            return
+        if tag == 'a' and attrs.get('href'):
+            self.paging_links.append(attrs['href'])
+        if tag not in VOID_TAGS:
+            self._paging.append(tag)
+
+    def handle_endtag(self, tag):
+        if self._item is None:
+            if tag in self._paging:
+                while self._paging.pop() != tag:
+                    pass
+            return
+        if tag == GRID_ITEM_TAG:
+            self.items.append(self._item)
+            self._item = None
+            self._capture = None
+            self._context = dict.fromkeys(self._context, 0)
+            return
+        if not any(open_tag == tag for open_tag, _, _ in self._stack):
+            return
+        # Kapatılmamış iç etiketler de burada kapanır
+        while self._stack:
+            open_tag, opened, capture = self._stack.pop()
+            for name in opened:
+                self._context[name] -= 1
+            if capture:
+                self._item[capture] = ''.join(self._text)
+                self._capture = None
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._capture is not None:
+            data = data.strip()
+            if data:
+                self._text.append(data)
+
+
+def _parse_grid_stream(content):
+    parser = GridItemParser()
+    parser.feed(_to_text(content))
+    parser.close()
+    return parser.items, parser.paging_links
+
+
+def _parse_grid_selectolax(content):
+    tree = LexborHTMLParser(_to_text(content))
+    items = []
+    for node in tree.css(GRID_ITEM_TAG):
+        item = _new_item()
+        item['links'] = [link.attributes['href'] for link in node.css('a[href]') if link.attributes.get('href')]
+        title = node.css_first('a.title')
+        if title is not None:
+            item['title'] = title.text(strip=True)
+        brand = node.css_first('[data-brand]')
+        if brand is not None:
+            item['brand'] = brand.attributes.get('data-brand')
+        price = node.css_first('.price tm-price .bgn')
+        if price is not None:
+            primary = price.css_first('.primary')
+            secondary = price.css_first('.secondary')
+            item['price_primary'] = primary.text(strip=True) if primary is not None else None
+            item['price_secondary'] = secondary.text(strip=True) if secondary is not None else None
+        items.append(item)
+    paging_links = [link.attributes['href'] for link in tree.css('.paging a[href]') if link.attributes.get('href')]
+    return items, paging_links
+
+
+def _parse_grid_soup(content, builder):
+    soup = BeautifulSoup(content, builder)
+    items = []
+    for node in soup.find_all(GRID_ITEM_TAG):
+        item = _new_item()
+        item['links'] = [link['href'] for link in node.find_all('a', href=True) if link['href']]
+        title = node.select_one('a.title')
+        if title is not None:
+            item['title'] = title.get_text(strip=True)
+        brand = node.select_one('[data-brand]')
+        if brand is not None:
+            item['brand'] = brand.get('data-brand')
+        price = node.select_one('.price tm-price .bgn')
+        if price is not None:
+            primary = price.select_one('.primary')
+            secondary = price.select_one('.secondary')
+            item['price_primary'] = primary.get_text(strip=True) if primary is not None else None
+            item['price_secondary'] = secondary.get_text(strip=True) if secondary is not None else None
+        items.append(item)
+    paging_links = [link['href'] for link in soup.select('.paging a[href]') if link['href']]
+    return items, paging_links
+
+
+def parse_grid(content, page_type='grid'):
+    """Grid sayfası: (tm-product-item kartları, sayfalama linkleri), ikisi de sayfa sırasıyla
+
+    Her kart: {'links', 'title', 'brand', 'price_primary', 'price_secondary'};
+    olmayan alanlar None. Kart yoksa boş liste döner.
+    """
+    name = backend_for(page_type)
+    if name == 'stream':
+        return _parse_grid_stream(content)
+    if name == 'selectolax':
+        return _parse_grid_selectolax(content)
+    return _parse_grid_soup(content, name)
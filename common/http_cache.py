@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+Tüm scraper'ların paylaştığı, diskte tutulan sıkıştırılmış HTTP yanıt önbelleği
+
+- URL anahtarlı, gövdeler zlib ile sıkıştırılmış olarak SQLite'ta saklanır
+- TTL dolmamış kayıtlar ağa hiç gidilmeden döner
+- TTL dolmuş kayıtlar ETag / Last-Modified ile koşullu olarak yenilenir (304)
+- Toplam boyut CACHE_MAX_BYTES'ı aşınca en uzun süredir kullanılmayanlar silinir (LRU);
+  toplam boyut bellekte tutulur, erişim zamanları toplu yazılır
+- Varsayılan TTL kısadır (1 saat): fiyatlar ve delta taramanın parmak izleri eski
+  sayfalardan üretilmesin; TTL dolunca sayfa değişmediyse 304 ile ucuza yenilenir
+- SCRAPER_OFFLINE=1 ile tamamen çevrimdışı çalışır: sadece önbellekten okunur
+
+Ayarlar ortam değişkenleriyle değiştirilebilir:
+    SCRAPER_CACHE_PATH, SCRAPER_CACHE_TTL (saniye), SCRAPER_CACHE_MAX_MB,
+    SCRAPER_CACHE (0 = kapalı), SCRAPER_OFFLINE (1 = sadece önbellek)
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ayarlar
+CACHE_PATH = os.environ.get('SCRAPER_CACHE_PATH', os.path.join(REPO_ROOT, '.cache', 'http_cache.sqlite'))
+CACHE_TTL = int(os.environ.get('SCRAPER_CACHE_TTL', 3600))  # Varsayılan 1 saat
+ACCESS_FLUSH_SIZE = 256  # Bu kadar önbellek isabetinin erişim zamanı tek seferde yazılır
+CACHE_MAX_BYTES = int(os.environ.get('SCRAPER_CACHE_MAX_MB', 1024)) * 1024 * 1024
+CACHE_ENABLED = os.environ.get('SCRAPER_CACHE', '1') != '0'
+OFFLINE = os.environ.get('SCRAPER_OFFLINE', '0') == '1'
+
+# Sadece bu başlıklar saklanır (gövdeyi yorumlamak ve yeniden doğrulamak için yeterli)
+STORED_HEADERS = ['content-type', 'etag', 'last-modified']
+
+
+class CacheMiss(requests.ConnectionError):
+    """Çevrimdışı modda URL önbellekte yoksa fırlatılır"""
+
+
+class CachedResponse:
+    """requests.Response'un scraper'ların kullandığı kısmını taklit eden yanıt"""
+
+    def __init__(self, url, status_code, headers, content, from_cache=False, truncated=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content
+        self.from_cache = from_cache
+        self.truncated = truncated  # Akış modunda gövdenin sonu okunmadan kesildi
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def encoding(self):
+        content_type = self.headers.get('content-type', '')
+        if 'charset=' in content_type:
+            return content_type.split('charset=')[-1].split(';')[0].strip()
+        return 'utf-8'
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class ResponseCache:
+    """SQLite üzerinde URL -> sıkıştırılmış yanıt deposu (thread-safe)"""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)')
+        self._conn.commit()
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        self._accessed = {}  # URL -> henüz yazılmamış son erişim zamanı
+
+    def get(self, url):
+        """Kaydı döndürür: {'status', 'headers', 'content', 'fetched_at'} veya None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, headers, body, fetched_at FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[url] = time.time()
+            if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+                self._flush_access()
+                self._conn.commit()
+        status, headers, body, fetched_at = row
+        return {
+            'status': status,
+            'headers': json.loads(headers),
+            'content': zlib.decompress(body),
+            'fetched_at': fetched_at,
+        }
+
+    def is_fresh(self, entry):
+        return time.time() - entry['fetched_at'] < self.ttl
+
+    def put(self, url, status, headers, content):
+        """Yanıtı sıkıştırarak saklar, gerekirse LRU temizliği yapar"""
+        stored_headers = {k: v for k, v in headers.items() if k.lower() in STORED_HEADERS}
+        body = zlib.compress(content, 6)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+            self._total_bytes += len(body) - (row[0] if row else 0)
+            self._accessed.pop(url, None)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (url, status, headers, body, size, fetched_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, status, json.dumps(stored_headers), body, len(body), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, url, headers=None):
+        """304 Not Modified sonrası kaydın tazelik süresini yeniler"""
+        with self._lock:
+            if headers:
+                row = self._conn.execute('SELECT headers FROM responses WHERE url = ?', (url,)).fetchone()
+                if row:
+                    stored_headers = json.loads(row[0])
+                    stored_headers.update({k: v for k, v in headers.items() if k.lower() in STORED_HEADERS})
+                    self._conn.execute('UPDATE responses SET headers = ? WHERE url = ?', (json.dumps(stored_headers), url))
+            now = time.time()
+            self._accessed.pop(url, None)
+            self._conn.execute('UPDATE responses SET fetched_at = ?, last_access = ? WHERE url = ?', (now, now, url))
+            self._conn.commit()
+
+    def _flush_access(self):
+        """Biriken erişim zamanlarını yazar (kilit tutulurken çağrılır, commit çağırana aittir)"""
+        if self._accessed:
+            self._conn.executemany('UPDATE responses SET last_access = ? WHERE url = ?',
+                                   [(accessed, url) for url, accessed in self._accessed.items()])
+            self._accessed.clear()
+
+    def _evict(self):
+        """Toplam boyut sınırı aşıldıysa en eski erişilen kayıtları siler (kilit tutulurken çağrılır)"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        self._flush_access()
+        rows = self._conn.execute('SELECT url, size FROM responses ORDER BY last_access ASC')
+        for url, size in rows.fetchall():
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self._total_bytes -= size
+
+    def flush(self):
+        """Bekleyen erişim zamanlarını diske yazar"""
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            count, total = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        return {'entries': count, 'bytes': total}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Süreç boyunca paylaşılan önbelleği döndürür (ilk kullanımda açılır)"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+            atexit.register(_default_cache.flush)
+        return _default_cache
+
+
+def cached_get(url, headers=None, timeout=10, fetch=None, cache=None, offline=None):
+    """Önbellek destekli GET; requests.Response benzeri bir CachedResponse döndürür
+
+    fetch: ağ isteğini yapan fonksiyon (varsayılan requests.get)
+    """
+    fetch = fetch or requests.get
+    if not CACHE_ENABLED and cache is None:
+        response = fetch(url, headers=headers, timeout=timeout)
+        return CachedResponse(url, response.status_code, response.headers, response.content,
+                              truncated=getattr(response, 'truncated', False))
+
+    cache = cache or get_default_cache()
+    offline = OFFLINE if offline is None else offline
+
+    entry = cache.get(url)
+    if entry is not None and (offline or cache.is_fresh(entry)):
+        return CachedResponse(url, entry['status'], entry['headers'], entry['content'], from_cache=True)
+    if offline:
+        raise CacheMiss(f"Çevrimdışı mod: önbellekte yok: {url}")
+
+    # Süresi dolmuş kayıt varsa koşullu istek at
+    request_headers = dict(headers or {})
+    if entry is not None:
+        stored = CaseInsensitiveDict(entry['headers'])
+        if stored.get('etag'):
+            request_headers['If-None-Match'] = stored['etag']
+        if stored.get('last-modified'):
+            request_headers['If-Modified-Since'] = stored['last-modified']
+
+    response = fetch(url, headers=request_headers, timeout=timeout)
+
+    if response.status_code == 304 and entry is not None:
+        cache.refresh(url, response.headers)
+        return CachedResponse(url, entry['status'], entry['headers'], entry['content'], from_cache=True)
+
+    # Erken kesilmiş (eksik) gövde önbelleğe yazılmaz
+    truncated = getattr(response, 'truncated', False)
+    if response.status_code == 200 and not truncated:
+        cache.put(url, response.status_code, response.headers, response.content)
+
+    return CachedResponse(url, response.status_code, response.headers, response.content, truncated=truncated)
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Tüm scraper'ların kullandığı ortak HTTP istemcisi
+
+- Tek bir requests.Session: keep-alive ile bağlantılar tekrar kullanılır (her sayfada yeni TCP+TLS yok)
+- Host başına bağlantı sınırı (PER_HOST_CONNECTIONS, havuz dolunca istek bekler)
+- 5xx / 429 ve bağlantı hatalarında jitter'lı üstel bekleme ile sınırlı sayıda tekrar
+- Her ağ isteği host başına uyarlanabilir hız sınırlayıcıdan (common.rate_limiter) geçer
+- Yanıtlar common.http_cache üzerinden önbelleğe alınır
+- get_until(): gövdeyi parça parça okur, gereken alanlar görülünce okumayı kesip bağlantıyı kapatır
+- get_metrics(): istek, havuzdan tekrar kullanım, yeni bağlantı ve tekrar deneme sayıları
+"""
+
+import functools
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from common import metrics
+from common.http_cache import CachedResponse, cached_get
+from common.rate_limiter import get_limiter
+
+# Ayarlar
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+PER_HOST_CONNECTIONS = 8  # Host başına açık tutulacak en fazla bağlantı
+POOL_HOSTS = 16  # Havuzda tutulacak farklı host sayısı
+MAX_RETRIES = 3  # İlk denemeye ek olarak en fazla tekrar sayısı
+BACKOFF_BASE = 0.5  # Saniye; her tekrarda ikiye katlanır (+ jitter)
+BACKOFF_MAX = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+STREAM_CHUNK_SIZE = 16 * 1024  # get_until okuma parçası
+MAX_MATCH_SPAN = 64 * 1024  # get_until desenlerinin bir eşleşmesi en fazla bu kadar bayt sürebilir
+STREAM_TAIL_SIZE = 16 * 1024  # Desenler eşleştikten sonra akış sonu için en fazla bu kadar daha okunur
+
+_session = None
+_session_lock = threading.Lock()
+_metrics = {'requests': 0, 'retries': 0, 'failures': 0, 'aborted': 0, 'bytes_read': 0}
+_metrics_lock = threading.Lock()
+
+
+def get_session():
+    """Süreç boyunca paylaşılan, bağlantı havuzlu Session'ı döndürür"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            # pool_block=True: host başına PER_HOST_CONNECTIONS'tan fazla bağlantı açılmaz
+            adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=PER_HOST_CONNECTIONS, pool_block=True)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+def _count(key, n=1):
+    with _metrics_lock:
+        _metrics[key] += n
+
+
+def _backoff_delay(attempt, response=None):
+    """Tekrar öncesi beklenecek süre: Retry-After varsa o, yoksa jitter'lı üstel bekleme"""
+    if response is not None:
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), BACKOFF_MAX)
+    delay = min(BACKOFF_BASE * (2 ** attempt), BACKOFF_MAX)
+    return random.uniform(0, delay)  # Full jitter
+
+
+def request_with_retries(url, headers=None, timeout=10, stream=False, method='GET'):
+    """Session üzerinden istek atar; geçici hatalarda tekrar dener, son yanıtı döndürür"""
+    session = get_session()
+    limiter = get_limiter()
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire(url)
+        _count('requests')
+        started = time.monotonic()
+        try:
+            response = session.request(method, url, headers=headers, timeout=timeout, stream=stream)
+        except (requests.ConnectionError, requests.Timeout):
+            limiter.feedback(url, error=True)
+            if attempt == MAX_RETRIES:
+                _count('failures')
+                raise
+            _count('retries')
+            time.sleep(_backoff_delay(attempt))
+            continue
+        total_time = time.monotonic() - started
+        limiter.feedback(url, status=response.status_code, latency=total_time)
+        # elapsed: istek gönderiminden başlıklar gelene kadar (DNS + bağlantı + TLS + TTFB)
+        connect_time = response.elapsed.total_seconds()
+        metrics.observe('connect', connect_time)
+        if not stream:
+            metrics.observe('download', max(total_time - connect_time, 0.0))
+
+        if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+            _count('retries')
+            delay = _backoff_delay(attempt, response)
+            response.close()
+            time.sleep(delay)
+            continue
+        if response.status_code >= 400:
+            _count('failures')
+        return response
+
+
+def get(url, headers=None, timeout=10, use_cache=True):
+    """Scraper'ların kullandığı GET: önbellek + havuzlu bağlantı + tekrar deneme"""
+    if use_cache:
+        return cached_get(url, headers=headers, timeout=timeout, fetch=request_with_retries)
+    return request_with_retries(url, headers=headers, timeout=timeout)
+
+
+def _fetch_until(url, patterns, headers=None, timeout=10):
+    """Gövdeyi okurken patterns'teki tüm (bytes) regex'ler eşleşince okumayı keser
+
+    Kesilen yanıtın truncated alanı True olur; bağlantı havuza dönmez, kapatılır.
+    """
+    response = request_with_retries(url, headers=headers, timeout=timeout, stream=True)
+    started = time.monotonic()
+    if response.status_code != 200:
+        content = response.content
+        metrics.observe('download', time.monotonic() - started)
+        return CachedResponse(url, response.status_code, response.headers, content)
+
+    # Desen no -> (kalan aşamalar, aramaya başlanacak konum); (başlangıç, bitiş) çiftinde
+    # başlangıç bulununca bitiş deseni sadece o konumdan itibaren aranır
+    remaining = {number: (list(pattern) if isinstance(pattern, tuple) else [pattern], 0)
+                 for number, pattern in enumerate(patterns)}
+    body = bytearray()
+    truncated = False
+    try:
+        chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        for chunk in chunks:
+            body += chunk
+            for number, (stages, scan_from) in list(remaining.items()):
+                while stages:
+                    match = stages[0].search(body, scan_from)
+                    if not match:
+                        break
+                    stages, scan_from = stages[1:], match.end()
+                if not stages:
+                    del remaining[number]
+                else:
+                    # Eşleşme bu konumdan önce başlayamaz (MAX_MATCH_SPAN varsayımı)
+                    remaining[number] = (stages, max(scan_from, len(body) - MAX_MATCH_SPAN))
+            if not remaining:
+                # Gövdenin kalanı kısaysa (ör. sadece </html>) akış sonuna kadar okunur; akış
+                # bittiyse yanıt tamdır ve önbelleğe yazılabilir. Content-Length'e bakılmaz:
+                # chunked yanıtlarda bu başlık yoktur.
+                tail = 0
+                for chunk in chunks:
+                    body += chunk
+                    tail += len(chunk)
+                    if tail > STREAM_TAIL_SIZE:
+                        truncated = True
+                        break
+                break
+    finally:
+        response.close()
+    metrics.observe('download', time.monotonic() - started)
+    _count('bytes_read', len(body))
+    if truncated:
+        _count('aborted')
+    return CachedResponse(url, response.status_code, response.headers, bytes(body), truncated=truncated)
+
+
+def get_until(url, patterns, headers=None, timeout=10, use_cache=True):
+    """Akış modunda GET: gereken alanların hepsi görülünce gövdenin kalanı okunmaz
+
+    patterns: gövdede aranacak bytes regex'leri (her biri bir alanın bittiğini gösterir).
+    MAX_MATCH_SPAN'den uzun sürebilecek alanlar için (başlangıç, bitiş) regex çifti verilir.
+    Önbellekteki tam gövde varsa o döner; erken kesilen gövde önbelleğe yazılmaz.
+    Dönen yanıtın truncated alanı gövdenin eksik olup olmadığını söyler.
+    """
+    fetch = functools.partial(_fetch_until, patterns=patterns)
+    if use_cache:
+        return cached_get(url, headers=headers, timeout=timeout, fetch=fetch)
+    return fetch(url, headers=headers, timeout=timeout)
+
+
+def stream(url, headers=None, timeout=30):
+    """Önbelleksiz, gövdesi parça parça okunacak GET (büyük dosyalar için)"""
+    return request_with_retries(url, headers=headers, timeout=timeout, stream=True)
+
+
+def head(url, headers=None, timeout=10):
+    """Önbelleksiz HEAD isteği (boyut / ETag kontrolü için)"""
+    return request_with_retries(url, headers=headers, timeout=timeout, method='HEAD')
+
+
+def get_metrics():
+    """İstemci metrikleri: istek/tekrar/hata sayıları ve bağlantı havuzu kullanımı"""
+    with _metrics_lock:
+        metrics = dict(_metrics)
+
+    new_connections = 0
+    pooled_requests = 0
+    pool_count = 0
+    if _session is not None:
+        pools = _session.get_adapter('https://').poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            pool_count += 1
+            new_connections += pool.num_connections
+            pooled_requests += pool.num_requests
+
+    metrics['new_connections'] = new_connections
+    # Yeni bağlantı açılmadan havuzdan karşılanan istekler
+    metrics['pool_hits'] = max(pooled_requests - new_connections, 0)
+    # Host başına ilk bağlantı dışındaki her yeni bağlantı bir yeniden bağlanmadır
+    metrics['reconnects'] = max(new_connections - pool_count, 0)
+    return metrics
+
+
+def format_metrics():
+    m = get_metrics()
+    rates = ', '.join(f"{host}: {rate}/s" for host, rate in get_limiter().rates().items())
+    return (f"İstek: {m['requests']}, havuzdan: {m['pool_hits']}, yeni bağlantı: {m['new_connections']}, "
+            f"yeniden bağlanma: {m['reconnects']}, tekrar: {m['retries']}, hata: {m['failures']}"
+            + (f", erken kesilen: {m['aborted']}" if m['aborted'] else '')
+            + (f" | hız: {rates}" if rates else ''))
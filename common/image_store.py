@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+İçerik adresli görsel deposu (sha256 -> blob) ve URL -> hash indeksi
+
+Aynı görsel birden çok üründe veya farklı URL varyantlarında (önbellek kırıcı
+parametreler) tekrar ettiği için her blob diskte bir kez tutulur;
+product_images/<Product ID>/image_N.jpg yolları bu bloblara hardlink'tir
+(hardlink desteklenmiyorsa kopya). URL -> hash indeksi sayesinde daha önce
+indirilmiş bir URL için ağa hiç gidilmez; sadece önbellek kırıcı parametresi
+farklı bir varyant bulunursa içerik önce sunucudan (ETag / boyut) doğrulanır.
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+# Kanonik URL'de atılan sorgu parametreleri (önbellek kırıcılar). Bunlar genelde görsel
+# değişince değiştiği için kanonik eşleşme (lookup_variant) doğrulanmadan kullanılmaz.
+# Boyut parametreleri (w, h, width, height, size) başka bir görsel döndürdüğü için korunur.
+IGNORED_QUERY_PARAMS = {'v', 'version', 'ver', 'cache', 'cb', 't'}
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def canonical_url(url):
+    """URL'den fragment'ı ve önbellek kırıcı parametreleri atar, kalan parametreleri sıralar"""
+    parsed = urlparse(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+             if k.lower() not in IGNORED_QUERY_PARAMS]
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path, parsed.params,
+                       urlencode(sorted(query)), ''))
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImageStore:
+    """Blob deposu + SQLite URL indeksi (thread-safe)"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, 'index.sqlite'), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                canonical_url TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_urls_canonical ON urls(canonical_url)')
+        self._conn.commit()
+
+    def blob_path(self, sha256, ext='.jpg'):
+        return os.path.join(self.root, sha256[:2], sha256 + ext)
+
+    def lookup(self, url):
+        """URL daha önce indirildiyse ve blob duruyorsa kaydı döndürür"""
+        with self._lock:
+            row = self._conn.execute('SELECT sha256, size, etag FROM urls WHERE url = ?', (url,)).fetchone()
+        if row is None or not os.path.exists(self.blob_path(row[0])):
+            return None
+        return {'sha256': row[0], 'size': row[1], 'etag': row[2]}
+
+    def lookup_variant(self, url):
+        """Kanonik hali aynı olan başka bir URL'nin kaydı (içerik farklı olabilir; çağıran doğrular)"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT sha256, size, etag FROM urls WHERE canonical_url = ? AND url != ? LIMIT 1',
+                (canonical_url(url), url)
+            ).fetchone()
+        if row is None or not os.path.exists(self.blob_path(row[0])):
+            return None
+        return {'sha256': row[0], 'size': row[1], 'etag': row[2]}
+
+    def record(self, url, sha256, size, etag=None):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO urls (url, canonical_url, sha256, size, etag) VALUES (?, ?, ?, ?, ?)',
+                (url, canonical_url(url), sha256, size, etag)
+            )
+            self._conn.commit()
+
+    def add(self, path, sha256=None):
+        """Dosyayı depoya taşır (blob zaten varsa dosyayı siler); hash'i döndürür"""
+        sha256 = sha256 or file_sha256(path)
+        blob = self.blob_path(sha256)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        with self._lock:
+            if os.path.exists(blob):
+                os.remove(path)
+            else:
+                os.replace(path, blob)
+        return sha256
+
+    def adopt(self, path):
+        """Depo dışındaki mevcut bir dosyayı depoya alır ve yerine blob'a link koyar"""
+        sha256 = file_sha256(path)
+        blob = self.blob_path(sha256)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        with self._lock:
+            if not os.path.exists(blob):
+                try:
+                    os.link(path, blob)
+                    return sha256
+                except OSError:
+                    shutil.copy2(path, blob)
+        self.link(sha256, path)
+        return sha256
+
+    def link(self, sha256, dest):
+        """dest yolunu blob'a hardlink yapar (gerekirse kopyalar)"""
+        blob = self.blob_path(sha256)
+        if os.path.exists(dest) and os.path.samefile(blob, dest):
+            return
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp_dest = dest + '.link'
+        if os.path.exists(tmp_dest):
+            os.remove(tmp_dest)
+        try:
+            os.link(blob, tmp_dest)
+        except OSError:
+            shutil.copy2(blob, tmp_dest)
+        os.replace(tmp_dest, dest)
+
+    def stats(self):
+        with self._lock:
+            urls, blobs = self._conn.execute('SELECT COUNT(*), COUNT(DISTINCT sha256) FROM urls').fetchone()
+        return {'urls': urls, 'blobs': blobs}
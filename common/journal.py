@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Satır sonuçlarını anında diske yazan append-only JSONL ilerleme günlüğü
+
+Her kayıt tek bir JSON satırıdır ve yazıldıktan hemen sonra fsync edilir.
+Yarıda kalmış son satır (çökme anında) okuma sırasında atlanır, böylece
+günlük hiçbir zaman bütünüyle bozulmaz; ilk yeni kayıttan önce satır sonu
+eklenir ki yeni kayıt o parçaya yapışıp kaybolmasın. Aynı anahtar için son
+kayıt geçerlidir.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class ProgressJournal:
+    """Anahtar bazlı append-only ilerleme günlüğü"""
+
+    def __init__(self, path, key='url'):
+        self.path = path
+        self.key = key
+        self._lock = threading.Lock()
+        self._checked_tail = False
+
+    def load(self):
+        """Günlüğü baştan okur, {anahtar: son kayıt} sözlüğü döndürür"""
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Çökme sırasında yarım kalmış satır
+                    continue
+                if isinstance(record, dict) and self.key in record:
+                    records[record[self.key]] = record
+        return records
+
+    def append(self, record):
+        """Kaydı günlüğün sonuna ekler ve diske yazılmasını bekler"""
+        record = dict(record)
+        record.setdefault('ts', time.time())
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            if not self._checked_tail:
+                line = self._tail_separator() + line
+                self._checked_tail = True
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _tail_separator(self):
+        """Dosya satır sonuyla bitmiyorsa (yarım kalmış son satır) önce yazılacak satır sonu"""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return ''
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return '' if f.read(1) == b'\n' else '\n'
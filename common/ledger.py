@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+URL bazlı, çökmeye dayanıklı tarama defteri (SQLite)
+
+Her ürün URL'si için durum, deneme sayısı, son hata ve zaman damgası tutulur:
+    pending        henüz işlenmedi
+    done           satırı Excel'e yazıldı (sadece kayıt anında işaretlenir)
+    skipped-cheap  fiyat eşiğin altında, tekrar denenmez
+    failed         hata; deneme sayısı MAX_ATTEMPTS'a ulaşana kadar tekrar denenir
+Elle düzenlenen START_FROM yerine her çalıştırma sadece pending ve tekrar
+denenebilir URL'leri işler; sıra ve yeniden başlatma sayısı önemli değildir.
+
+Kaydedilen (ve sayfa fiyatı yüzünden atlanan) her ürün için listeleme parmak izi
+(sitemap lastmod veya grid'deki ad) ve grid fiyatı da tutulur; delta taramada
+sadece değişen ürünler çekilir.
+"""
+
+import sqlite3
+import threading
+import time
+
+# Ayarlar
+MAX_ATTEMPTS = 3  # failed durumundaki URL en fazla kaç kez denensin
+
+PENDING = 'pending'
+DONE = 'done'
+SKIPPED_CHEAP = 'skipped-cheap'
+FAILED = 'failed'
+
+
+class ScrapeLedger:
+    """URL -> (durum, deneme sayısı, son hata, zaman) deposu (thread-safe)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at REAL NOT NULL,
+                fingerprint TEXT,
+                listing_price REAL
+            )
+        ''')
+        # Parmak izi sütunlarından önce oluşturulmuş defterler
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(urls)')}
+        for column, column_type in (('fingerprint', 'TEXT'), ('listing_price', 'REAL')):
+            if column not in columns:
+                self._conn.execute(f'ALTER TABLE urls ADD COLUMN {column} {column_type}')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_urls_status ON urls(status)')
+        self._conn.commit()
+
+    def add(self, urls):
+        """Deftere henüz girmemiş URL'leri pending olarak ekler"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO urls (url, status, updated_at) VALUES (?, ?, ?)',
+                [(url, PENDING, now) for url in urls]
+            )
+            self._conn.commit()
+
+    def reconcile(self, saved_urls):
+        """Defteri çıktı dosyasıyla eşitler
+
+        Dosyada satırı olan URL'ler done olur (tekrar yazılmaz); done görünüp dosyada
+        olmayanlar (örneğin dosya silindiyse) tekrar pending olur.
+        """
+        saved_urls = set(saved_urls)
+        now = time.time()
+        with self._lock:
+            done_urls = {row[0] for row in self._conn.execute('SELECT url FROM urls WHERE status = ?', (DONE,))}
+            self._conn.executemany(
+                'INSERT INTO urls (url, status, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(url) DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at',
+                [(url, DONE, now) for url in saved_urls - done_urls]
+            )
+            self._conn.executemany(
+                'UPDATE urls SET status = ?, updated_at = ? WHERE url = ?',
+                [(PENDING, now, url) for url in done_urls - saved_urls]
+            )
+            self._conn.commit()
+
+    def mark(self, urls, status, error=None):
+        """URL'lerin durumunu günceller ve deneme sayısını artırır"""
+        if isinstance(urls, str):
+            urls = [urls]
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                'INSERT INTO urls (url, status, attempts, last_error, updated_at) VALUES (?, ?, 1, ?, ?) '
+                'ON CONFLICT(url) DO UPDATE SET status = excluded.status, attempts = attempts + 1, '
+                'last_error = excluded.last_error, updated_at = excluded.updated_at',
+                [(url, status, error, now) for url in urls]
+            )
+            self._conn.commit()
+
+    def transition(self, urls, from_statuses, status):
+        """Sadece from_statuses durumundaki URL'leri status'a geçirir (deneme sayısı değişmez)
+
+        Değişen URL sayısını döndürür.
+        """
+        placeholders = ', '.join('?' * len(from_statuses))
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.executemany(
+                f'UPDATE urls SET status = ?, updated_at = ? WHERE url = ? AND status IN ({placeholders})',
+                [(status, now, url) + tuple(from_statuses) for url in urls]
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def fingerprints(self, status=DONE):
+        """status durumundaki URL'lerin son kayıttaki listeleme bilgisi: URL -> (parmak izi, grid fiyatı)"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT url, fingerprint, listing_price FROM urls WHERE status = ?', (status,)
+            ).fetchall()
+        return {url: (fingerprint, price) for url, fingerprint, price in rows}
+
+    def set_fingerprints(self, items):
+        """(URL, parmak izi, grid fiyatı) kayıtlarını yazar (durum değişmez)"""
+        with self._lock:
+            self._conn.executemany(
+                'UPDATE urls SET fingerprint = ?, listing_price = ? WHERE url = ?',
+                [(fingerprint, price, url) for url, fingerprint, price in items]
+            )
+            self._conn.commit()
+
+    def todo(self, max_attempts=MAX_ATTEMPTS):
+        """İşlenecek URL'ler: pending olanlar ve deneme hakkı kalan failed olanlar (eklenme sırasıyla)"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT url FROM urls WHERE status = ? OR (status = ? AND attempts < ?) ORDER BY rowid',
+                (PENDING, FAILED, max_attempts)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def counts(self):
+        """Durum başına URL sayısı"""
+        with self._lock:
+            return dict(self._conn.execute('SELECT status, COUNT(*) FROM urls GROUP BY status').fetchall())
+
+    def format_counts(self):
+        counts = self.counts()
+        return ', '.join(f"{status}: {counts.get(status, 0)}" for status in (DONE, SKIPPED_CHEAP, FAILED, PENDING))
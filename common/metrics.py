@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Aşama bazlı süre ölçümü ve metrik dosyası
+
+Sıcak yoldaki aşamalar (bağlantı, indirme, parse, çıkarım, çeviri, kaydetme)
+timer('aşama') ile sarılır; süreler sabit kovalı histogramlarda toplanır.
+start_run() ile başlatılan arka plan thread'i metrikleri düzenli olarak
+Prometheus metin formatında dosyaya yazar (işlenen/toplam, hız ve ETA dahil).
+
+    with metrics.timer('parse'):
+        soup = BeautifulSoup(...)
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Ayarlar
+DUMP_INTERVAL = 15  # Metrik dosyasının yazılma aralığı (saniye)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRIC_PREFIX = 'scraper'
+
+
+class Histogram:
+    """Kümülatif olmayan kova sayaçları + toplam/adet"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Son kova: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+_histograms = {}
+_lock = threading.Lock()
+_progress = {'done': 0, 'total': 0, 'started': None}
+_dumper = None
+
+
+def observe(stage, seconds):
+    with _lock:
+        histogram = _histograms.get(stage)
+        if histogram is None:
+            histogram = _histograms[stage] = Histogram()
+        histogram.observe(seconds)
+
+
+@contextmanager
+def timer(stage):
+    """Bloğun süresini verilen aşamanın histogramına ekler"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+
+def set_done(done):
+    """İşlenen ürün sayısını günceller (hız ve ETA bunun üzerinden hesaplanır)"""
+    with _lock:
+        _progress['done'] = done
+
+
+def progress():
+    """(işlenen, toplam, ürün/saniye, kalan süre saniye veya None)"""
+    with _lock:
+        done, total, started = _progress['done'], _progress['total'], _progress['started']
+    elapsed = time.monotonic() - started if started else 0
+    rate = done / elapsed if elapsed > 0 else 0.0
+    eta = (total - done) / rate if rate > 0 and total >= done else None
+    return done, total, rate, eta
+
+
+def summary():
+    """Aşama başına adet / toplam / ortalama süre"""
+    with _lock:
+        return {stage: {'count': h.count, 'sum': h.sum, 'avg': h.sum / h.count if h.count else 0.0}
+                for stage, h in _histograms.items()}
+
+
+def render_prometheus(extra=None):
+    """Tüm metrikleri Prometheus metin formatında döndürür"""
+    lines = [
+        f'# HELP {METRIC_PREFIX}_stage_seconds Aşama başına geçen süre',
+        f'# TYPE {METRIC_PREFIX}_stage_seconds histogram',
+    ]
+    with _lock:
+        snapshot = {stage: (h.buckets, list(h.counts), h.sum, h.count) for stage, h in _histograms.items()}
+    for stage in sorted(snapshot):
+        buckets, counts, total, count = snapshot[stage]
+        cumulative = 0
+        for bound, bucket_count in zip(buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{METRIC_PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'{METRIC_PREFIX}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+        lines.append(f'{METRIC_PREFIX}_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+        lines.append(f'{METRIC_PREFIX}_stage_seconds_count{{stage="{stage}"}} {count}')
+
+    done, total, rate, eta = progress()
+    lines.append(f'{METRIC_PREFIX}_items_done {done}')
+    lines.append(f'{METRIC_PREFIX}_items_total {total}')
+    lines.append(f'{METRIC_PREFIX}_throughput_items_per_second {rate:.4f}')
+    if eta is not None:
+        lines.append(f'{METRIC_PREFIX}_eta_seconds {eta:.1f}')
+
+    for name, value in sorted((extra or {}).items()):
+        lines.append(f'{METRIC_PREFIX}_{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def dump(path, extra=None):
+    """Metrikleri atomik olarak dosyaya yazar"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(render_prometheus(extra() if callable(extra) else extra))
+    os.replace(tmp_path, path)
+
+
+class _PeriodicDumper(threading.Thread):
+    def __init__(self, path, interval, extra):
+        super().__init__(daemon=True)
+        self.path = path
+        self.interval = interval
+        self.extra = extra
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                dump(self.path, self.extra)
+            except OSError as e:
+                print(f"⚠️  Metrik dosyası yazılamadı: {str(e)}")
+
+
+def start_run(path, total, interval=DUMP_INTERVAL, extra=None):
+    """İlerlemeyi sıfırlar ve metrikleri düzenli olarak path'e yazmaya başlar
+
+    extra: {isim: değer} döndüren fonksiyon (örneğin HTTP istemci metrikleri)
+    """
+    global _dumper
+    with _lock:
+        _progress.update(done=0, total=total, started=time.monotonic())
+    if _dumper is None:
+        _dumper = _PeriodicDumper(path, interval, extra)
+        _dumper.start()
+
+
+def finish_run():
+    """Arka plan yazıcısını durdurur ve son metrikleri yazar"""
+    global _dumper
+    if _dumper is not None:
+        _dumper.stopped.set()
+        dump(_dumper.path, _dumper.extra)
+        _dumper = None
+
+
+def format_eta():
+    done, total, rate, eta = progress()
+    if eta is None:
+        return f"{done}/{total}"
+    minutes, seconds = divmod(int(eta), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{done}/{total}, {rate:.2f} ürün/s, kalan ~{hours:d}:{minutes:02d}:{seconds:02d}"
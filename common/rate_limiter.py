@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Host başına uyarlanabilir (AIMD) token-bucket hız sınırlayıcı
+
+Sabit DELAY beklemeleri yerine her host için ayrı bir token kovası tutulur:
+- Sağlıklı yanıtlarda hız her istekte INCREASE_STEP kadar artar (additive increase)
+- 429/503, bağlantı hatası veya gecikmenin belirgin şekilde artmasında hız
+  DECREASE_FACTOR ile çarpılır (multiplicative decrease)
+Böylece her site izin verdiği kadar hızlı, ama daha hızlı değil, taranır.
+Scraper'lar ve çevirici aynı limiter'ı paylaşır (get_limiter()).
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+# Ayarlar
+INITIAL_RATE = 1.0  # İstek/saniye (eski DELAY = 1 ile aynı başlangıç)
+MIN_RATE = 0.1
+MAX_RATE = 20.0
+BURST = 2  # Kovada birikebilecek en fazla token
+INCREASE_STEP = 0.1  # Sağlıklı yanıt başına eklenen istek/saniye
+DECREASE_FACTOR = 0.5  # 429/503/hata durumunda hız çarpanı
+LATENCY_DECREASE_FACTOR = 0.8  # Gecikme yükselince uygulanan daha yumuşak çarpan
+LATENCY_THRESHOLD = 2.0  # Gecikme, taban gecikmenin bu katını aşarsa yavaşla
+THROTTLE_STATUSES = {429, 503}
+
+# Host'a özel başlangıç hızları (eski sabit beklemelere karşılık gelir)
+INITIAL_RATES = {
+    'www.technomarket.bg': 0.5,  # DELAY = 2
+    'translate.google.com': 2.0,  # time.sleep(0.5)
+    'www.technopolis.bg': 4.0,  # scrape_images.py: PER_HOST_LIMIT = 4 eşzamanlı istek
+}
+
+
+class HostLimiter:
+    """Tek bir host için token kovası ve AIMD hız ayarı"""
+
+    def __init__(self, rate=INITIAL_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE, burst=BURST):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.base_latency = None  # Gözlenen en düşük (yavaşça güncellenen) gecikme
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Token alınana kadar bekler"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def feedback(self, status=None, latency=None, error=False):
+        """Yanıt sonucuna göre hızı ayarlar (status=None ve error=True: bağlantı hatası)"""
+        with self._lock:
+            if error or status in THROTTLE_STATUSES:
+                self.rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+                # Bekleyen istekler yeni hıza uysun diye biriken token'ları sıfırla
+                self.tokens = min(self.tokens, 0)
+                return
+
+            if latency is not None:
+                if self.base_latency is None:
+                    self.base_latency = latency
+                else:
+                    # Taban gecikme: düşüşleri hemen, artışları yavaşça takip et
+                    self.base_latency = min(latency, self.base_latency * 0.95 + latency * 0.05)
+                if latency > self.base_latency * LATENCY_THRESHOLD:
+                    self.rate = max(self.min_rate, self.rate * LATENCY_DECREASE_FACTOR)
+                    return
+
+            self.rate = min(self.max_rate, self.rate + INCREASE_STEP)
+
+
+class RateLimiter:
+    """Host -> HostLimiter eşlemesi"""
+
+    def __init__(self, initial_rates=None):
+        self.initial_rates = dict(INITIAL_RATES if initial_rates is None else initial_rates)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def for_host(self, url_or_host):
+        host = urlparse(url_or_host).netloc if '://' in url_or_host else url_or_host
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostLimiter(rate=self.initial_rates.get(host, INITIAL_RATE))
+            return self._hosts[host]
+
+    def acquire(self, url_or_host):
+        self.for_host(url_or_host).acquire()
+
+    def feedback(self, url_or_host, status=None, latency=None, error=False):
+        self.for_host(url_or_host).feedback(status=status, latency=latency, error=error)
+
+    def rates(self):
+        """Host başına güncel hız (istek/saniye)"""
+        with self._lock:
+            return {host: round(limiter.rate, 2) for host, limiter in self._hosts.items()}
+
+
+_default_limiter = RateLimiter()
+
+
+def get_limiter():
+    """Tüm scraper'ların ve çeviricinin paylaştığı limiter"""
+    return _default_limiter
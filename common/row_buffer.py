@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Sütun bazlı satır biriktirici
+
+Her ürün için pd.concat([df, pd.DataFrame([new_row])]) tüm tabloyu kopyalar
+(binlerce üründe O(n²)). RowBuffer satırları sütun başına Python listelerinde
+biriktirir; DataFrame sadece kayıt (checkpoint) anında bir kez oluşturulur.
+"""
+
+import pandas as pd
+
+
+class RowBuffer:
+    """Sütun adı -> değer listesi; satır ekleme O(sütun sayısı)"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self._data = {column: [] for column in self.columns}
+        self._rows = 0
+        self._indexes = {}  # Anahtar sütun -> {değer: satır no} (ilk kullanımda oluşturulur)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Mevcut bir DataFrame'in satırlarıyla başlatır (sütun sırası korunur)"""
+        buffer = cls(df.columns)
+        for column in buffer.columns:
+            buffer._data[column] = df[column].tolist()
+        buffer._rows = len(df)
+        return buffer
+
+    def __len__(self):
+        return self._rows
+
+    def _add_missing_columns(self, row):
+        for column in row:
+            if column not in self._data:
+                self.columns.append(column)
+                self._data[column] = [None] * self._rows
+
+    def _index(self, key):
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = {}
+            for position, value in enumerate(self._data.get(key, [])):
+                index.setdefault(value, position)
+        return index
+
+    def append(self, row):
+        """Satırı ekler; olmayan sütunlar boş kalır, yeni sütunlar sona eklenir"""
+        self._add_missing_columns(row)
+        for column in self.columns:
+            self._data[column].append(row.get(column))
+        for key, index in self._indexes.items():
+            index.setdefault(row.get(key), self._rows)
+        self._rows += 1
+
+    def update(self, key, value, values):
+        """key sütunu value olan satırın verilen sütunlarını günceller; satır yoksa False"""
+        position = self._index(key).get(value)
+        if position is None:
+            return False
+        self._add_missing_columns(values)
+        for column, new_value in values.items():
+            self._data[column][position] = new_value
+        return True
+
+    def upsert(self, row, key):
+        """key sütunu aynı olan satır varsa onu günceller, yoksa satırı ekler"""
+        if not self.update(key, row.get(key), row):
+            self.append(row)
+
+    def remove(self, key, values):
+        """key sütunu values içinde olan satırları siler; silinen satır sayısını döndürür"""
+        if key not in self._data:
+            return 0
+        values = set(values)
+        keep = [position for position, value in enumerate(self._data[key]) if value not in values]
+        removed = self._rows - len(keep)
+        if removed:
+            for column in self.columns:
+                self._data[column] = [self._data[column][position] for position in keep]
+            self._rows = len(keep)
+            self._indexes.clear()
+        return removed
+
+    def to_frame(self):
+        return pd.DataFrame(self._data, columns=self.columns)
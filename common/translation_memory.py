@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Diskte tutulan çeviri belleği (source, target, normalize metin) -> çeviri
+
+Ürün adları, kategori yolları ve açıklama satırları binlerce üründe tekrar ettiği
+için başarılı her çeviri SQLite'a yazılır; aynı metin bir daha çeviriciye gitmez.
+Sık kullanılan kayıtlar ayrıca süreç içi bir LRU'da tutulur (SQLite'a da gidilmez).
+
+Ayarlar ortam değişkenleriyle değiştirilebilir:
+    SCRAPER_TRANSLATION_MEMORY_PATH, SCRAPER_TRANSLATION_LRU_SIZE
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ayarlar
+MEMORY_PATH = os.environ.get('SCRAPER_TRANSLATION_MEMORY_PATH',
+                             os.path.join(REPO_ROOT, '.cache', 'translation_memory.sqlite'))
+LRU_SIZE = int(os.environ.get('SCRAPER_TRANSLATION_LRU_SIZE', 20000))  # Bellekte tutulan kayıt sayısı
+
+
+def normalize_text(text):
+    """Anahtar için metni normalize eder: baş/son boşluklar atılır, iç boşluklar teke indirilir"""
+    return ' '.join(str(text).split())
+
+
+class TranslationMemory:
+    """SQLite + LRU çeviri belleği (thread-safe)"""
+
+    def __init__(self, path=MEMORY_PATH, lru_size=LRU_SIZE):
+        self.path = path
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS translations (
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                text TEXT NOT NULL,
+                translated TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (source, target, text)
+            )
+        ''')
+        self._conn.commit()
+
+    def _remember(self, key, translated):
+        self._lru[key] = translated
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get(self, source, target, text):
+        """Çeviri bellekteyse döndürür, yoksa None"""
+        key = (source, target, normalize_text(text))
+        with self._lock:
+            translated = self._lru.get(key)
+            if translated is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return translated
+            row = self._conn.execute(
+                'SELECT translated FROM translations WHERE source = ? AND target = ? AND text = ?', key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._remember(key, row[0])
+            self.hits += 1
+            return row[0]
+
+    def put(self, source, target, text, translated):
+        key = (source, target, normalize_text(text))
+        with self._lock:
+            self._remember(key, translated)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO translations (source, target, text, translated, created_at) '
+                'VALUES (?, ?, ?, ?, ?)', key + (translated, time.time())
+            )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+            return {'entries': entries, 'hits': self.hits, 'misses': self.misses}
+
+    def format_stats(self):
+        stats = self.stats()
+        return f"{stats['hits']} bellekten, {stats['misses']} çeviriciden, {stats['entries']} kayıt"
+
+
+_default_memory = None
+_default_memory_lock = threading.Lock()
+
+
+def get_default_memory():
+    """Süreç boyunca paylaşılan çeviri belleğini döndürür (ilk kullanımda açılır)"""
+    global _default_memory
+    with _default_memory_lock:
+        if _default_memory is None:
+            _default_memory = TranslationMemory()
+        return _default_memory
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Toplu (batch) ve eşzamanlı çeviri işçisi
+
+Çevrilecek metinler submit() ile kuyruğa konur ve hemen bir Future döner; çağıran
+taraf (örneğin sonraki ürünü çekerken) beklemeden devam eder:
+- Çeviri belleğinde olan metinler anında tamamlanır
+- Aynı metin zaten kuyrukta / çeviride ise aynı Future paylaşılır (coalescing)
+- Bekleyen metinler dil çifti başına, backend'in karakter sınırına kadar
+  tek istekte birleştirilir ve küçük bir thread havuzunda çevrilir
+
+Backend'ler TranslationBackend arayüzünü uygular: GoogleBackend (deep-translator)
+ve testler / çevrimdışı çalışma için metni olduğu gibi döndüren StubBackend.
+SCRAPER_TRANSLATION_BACKEND=stub ile stub seçilir.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from common import metrics
+from common.rate_limiter import get_limiter
+from common.translation_memory import get_default_memory, normalize_text
+
+try:
+    from deep_translator import GoogleTranslator
+    TRANSLATOR_AVAILABLE = True
+except ImportError:
+    TRANSLATOR_AVAILABLE = False
+
+# Ayarlar
+BACKEND = os.environ.get('SCRAPER_TRANSLATION_BACKEND', 'google')
+WORKERS = 3  # Eşzamanlı çeviri isteği sayısı
+BATCH_WAIT = 0.05  # İlk metinden sonra aynı pakete eklenecek metinler için bekleme (saniye)
+TRANSLATOR_HOST = 'translate.google.com'  # Çeviri istekleri için limiter anahtarı
+
+
+class TranslationBackend:
+    """Çeviri servisi arayüzü"""
+
+    max_batch_chars = 4500  # Tek istekte gönderilebilecek en fazla karakter
+    separator = '\n'  # Paketteki metinleri ayıran dize (bunu içeren metinler tek başına gider)
+    limiter_key = None  # Hız sınırlayıcı anahtarı (None: sınırlama yok)
+    cacheable = True  # Sonuçlar çeviri belleğine yazılsın mı
+
+    def translate_batch(self, texts, source, target):
+        """Metin listesini çevirir; aynı uzunlukta liste döndürür
+
+        Paketin sonucu metinlere ayrılamıyorsa None döndürülür; işçi metinleri
+        o zaman tek tek (yine hız sınırlayıcı arkasında) gönderir.
+        """
+        raise NotImplementedError
+
+
+class GoogleBackend(TranslationBackend):
+    """deep-translator GoogleTranslator (5000 karakter sınırı)
+
+    GoogleTranslator.translate() istek parametrelerini nesnenin üzerine yazar;
+    aynı nesne thread'ler arasında paylaşılırsa eşzamanlı paketler birbirinin
+    metnini gönderebilir. Bu yüzden her thread kendi çevirmenlerini kullanır.
+    """
+
+    limiter_key = TRANSLATOR_HOST
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _translator(self, source, target):
+        translators = getattr(self._local, 'translators', None)
+        if translators is None:
+            translators = self._local.translators = {}
+        translator = translators.get((source, target))
+        if translator is None:
+            translator = translators[(source, target)] = GoogleTranslator(source=source, target=target)
+        return translator
+
+    def translate_batch(self, texts, source, target):
+        translator = self._translator(source, target)
+        if len(texts) == 1:
+            return [translator.translate(texts[0])]
+        # Metinler satır satır birleştirilip tek istekte gönderilir
+        translated = translator.translate(self.separator.join(texts)) or ''
+        parts = translated.split(self.separator)
+        if len(parts) == len(texts):
+            return [part.strip() for part in parts]
+        # Satır sayısı korunmadı: işçi metinleri tek tek gönderir
+        return None
+
+
+class StubBackend(TranslationBackend):
+    """Ağa gitmeyen backend: metni (isteğe bağlı önekle) olduğu gibi döndürür"""
+
+    cacheable = False
+
+    def __init__(self, prefix=''):
+        self.prefix = prefix
+        self.calls = 0
+
+    def translate_batch(self, texts, source, target):
+        self.calls += 1
+        return [self.prefix + text for text in texts]
+
+
+class TranslationWorker:
+    """Metinleri paketleyip thread havuzunda çeviren işçi"""
+
+    def __init__(self, backend, memory=None, workers=WORKERS, batch_wait=BATCH_WAIT):
+        self.backend = backend
+        self.memory = memory or get_default_memory()
+        self.batch_wait = batch_wait
+        self.stats = {'batches': 0, 'texts': 0, 'coalesced': 0, 'errors': 0}
+        self._in_flight = {}  # (source, target, normalize metin) -> Future
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='translate')
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, text, source='bg', target='tr'):
+        """Metni çeviri kuyruğuna koyar; çeviriyi (hata olursa orijinal metni) veren Future döndürür"""
+        text = str(text).strip()
+        future = Future()
+        if not text:
+            future.set_result(text)
+            return future
+
+        translated = self.memory.get(source, target, text)
+        if translated is not None:
+            future.set_result(translated)
+            return future
+
+        key = (source, target, normalize_text(text))
+        with self._lock:
+            existing = self._in_flight.get(key)
+            if existing is not None:
+                self.stats['coalesced'] += 1
+                return existing
+            self._in_flight[key] = future
+        self._queue.put((key, text, future))
+        return future
+
+    def translate(self, text, source='bg', target='tr'):
+        """Senkron çeviri (submit + bekle)"""
+        return self.submit(text, source, target).result()
+
+    def _dispatch(self):
+        """Kuyruktaki metinleri dil çifti ve karakter sınırına göre paketleyip havuza verir
+
+        Paket, ilk metni geldikten batch_wait saniye sonra veya karakter sınırı dolunca gönderilir.
+        """
+        pending = {}  # (source, target) -> [(key, text, future)]
+        pending_chars = {}
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is not None:
+                key, text, future = item
+                pair = key[:2]
+                if self.backend.separator in text or len(text) >= self.backend.max_batch_chars:
+                    self._executor.submit(self._run_batch, pair, [item])
+                else:
+                    if pending.get(pair) and pending_chars[pair] + len(text) > self.backend.max_batch_chars:
+                        self._executor.submit(self._run_batch, pair, pending.pop(pair))
+                    if pair not in pending:
+                        pending[pair] = []
+                        pending_chars[pair] = 0
+                    pending[pair].append(item)
+                    pending_chars[pair] += len(text) + len(self.backend.separator)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.batch_wait
+
+            if deadline is not None and time.monotonic() >= deadline:
+                for pair, items in pending.items():
+                    self._executor.submit(self._run_batch, pair, items)
+                pending.clear()
+                deadline = None
+
+    def _call_backend(self, texts, source, target):
+        """Tek backend isteği (hız sınırlayıcı arkasında); sonuç sayısı metin sayısıyla aynı olmalı"""
+        limiter = get_limiter() if self.backend.limiter_key else None
+        try:
+            if limiter:
+                limiter.acquire(self.backend.limiter_key)
+            started = time.monotonic()
+            with metrics.timer('translate'):
+                translations = self.backend.translate_batch(texts, source, target)
+            if limiter:
+                limiter.feedback(self.backend.limiter_key, status=200, latency=time.monotonic() - started)
+        except Exception:
+            if limiter:
+                limiter.feedback(self.backend.limiter_key, error=True)
+            raise
+        if translations is not None and len(translations) != len(texts):
+            raise ValueError(f"{len(texts)} metin için {len(translations)} çeviri döndü")
+        return translations
+
+    def _run_batch(self, pair, items):
+        source, target = pair
+        texts = [text for _, text, _ in items]
+        try:
+            translations = self._call_backend(texts, source, target)
+            if translations is None:
+                # Paket metinlere ayrılamadı: her metin ayrı istekle
+                translations = [self._call_backend([text], source, target)[0] for text in texts]
+        except Exception as e:
+            print(f"    Çeviri hatası: {str(e)}")
+            translations = [None] * len(items)
+            with self._lock:
+                self.stats['errors'] += 1
+
+        with self._lock:
+            self.stats['batches'] += 1
+            self.stats['texts'] += len(items)
+        for (key, text, future), translated in zip(items, translations):
+            if translated and self.backend.cacheable:
+                self.memory.put(source, target, text, translated)
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_result(translated or text)
+
+    def format_stats(self):
+        return (f"{self.stats['texts']} metin / {self.stats['batches']} istek, "
+                f"{self.stats['coalesced']} birleştirilen, {self.stats['errors']} hata")
+
+
+_default_worker = None
+_default_worker_lock = threading.Lock()
+
+
+def create_backend(name=BACKEND):
+    if name == 'stub':
+        return StubBackend()
+    if name == 'google':
+        return GoogleBackend() if TRANSLATOR_AVAILABLE else None
+    raise ValueError(f"Bilinmeyen çeviri backend'i: {name}")
+
+
+def get_default_worker():
+    """Süreç boyunca paylaşılan çeviri işçisini döndürür (backend yoksa None)"""
+    global _default_worker
+    with _default_worker_lock:
+        if _default_worker is None:
+            backend = create_backend()
+            if backend is None:
+                return None
+            _default_worker = TranslationWorker(backend)
+        return _default_worker
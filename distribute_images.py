@@ -6,12 +6,16 @@ Diğer görseller sütunundaki virgülle ayrılmış linkleri Image 1-5 sütunla
 
 import pandas as pd
 
+from common.dataset_store import DatasetStore
+
 # Ayarlar
 EXCEL_FILE = 'Technopolis_Tum_Urunler_20250917_164841_Brands_Translated_NoDuplicates (1).xlsx'
+DATASET = 'technopolis'  # Veri deposundaki adı (xlsx sadece export_xlsx.py ile üretilir)
 
 def main():
-    print("Excel dosyası okunuyor...")
-    df = pd.read_excel(EXCEL_FILE)
+    print("Veri deposu okunuyor...")
+    store = DatasetStore(DATASET, EXCEL_FILE)
+    df = store.load()
     
     # Gerekli sütunları kontrol et
     other_images_col = 'Diğer görseller'
@@ -53,13 +57,14 @@ def main():
             if processed_count % 100 == 0:
                 print(f"  İşlenen satır: {processed_count}...")
     
-    # Excel dosyasını güncelle
+    # Veri deposunu güncelle
     print(f"\n✅ {processed_count} satırdaki görseller işlendi")
     print(f"✅ Toplam {total_images} görsel Image 1-5 sütunlarına dağıtıldı")
     
-    print("\nExcel dosyası güncelleniyor...")
-    df.to_excel(EXCEL_FILE, index=False)
-    print(f"✅ Excel dosyası güncellendi: {EXCEL_FILE}")
+    print("\nVeri deposu güncelleniyor...")
+    store.save(df)
+    print(f"✅ Veri deposu güncellendi: {store.data_path}")
+    print(f"   (xlsx için: python export_xlsx.py {DATASET})")
     
     # Özet
     print("\n" + "="*60)
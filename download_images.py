@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Veri setindeki görsel linklerini product_images/<Product ID>/image_N.jpg olarak indiren script
+
+- 'Ana görsel', 'Image 1-5' ve 'Diğer görseller' sütunlarındaki linkler sırayla
+  (tekrarlar atılarak) image_1.jpg, image_2.jpg ... olarak kaydedilir
+- İndirmeler paralel yapılır, gövde parça parça diske yazılır (bellek kullanımı sınırlı)
+- Yarım kalan dosyalar (.part) HTTP Range ile kaldığı yerden devam eder
+- Boyutu / ETag'i tutan dosyalar tekrar indirilmez
+- Görseller içerik adresli depoda (product_images/.store, sha256) bir kez tutulur,
+  image_N.jpg yolları bu bloblara hardlink'tir; daha önce indirilmiş URL'ler
+  (URL -> hash indeksi) ağa gidilmeden bağlanır
+- Her dosyanın kaynağı, boyutu, ETag'i ve hash'i product_images/manifest.json'a yazılır
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import pandas as pd
+
+from common import http_client
+from common.dataset_store import DatasetStore
+from common.image_store import ImageStore
+
+# Ayarlar
+EXCEL_FILE = 'Technopolis_Tum_Urunler_20250917_164841_Brands_Translated_NoDuplicates (1).xlsx'
+DATASET = 'technopolis'  # Veri deposundaki adı (depo yoksa EXCEL_FILE içe aktarılır)
+OUTPUT_DIR = 'product_images'
+MANIFEST_FILE = os.path.join(OUTPUT_DIR, 'manifest.json')
+STORE_DIR = os.path.join(OUTPUT_DIR, '.store')  # sha256 -> blob deposu ve URL indeksi
+MAX_WORKERS = 8  # Eşzamanlı indirme sayısı
+CHUNK_SIZE = 64 * 1024  # Diske yazılan parça boyutu (byte)
+MANIFEST_SAVE_INTERVAL = 200  # Her kaç dosyada bir manifest kaydedilsin
+IMAGE_COLUMNS = ['Ana görsel', 'Image 1', 'Image 2', 'Image 3', 'Image 4', 'Image 5']
+OTHER_IMAGES_COLUMN = 'Diğer görseller'
+
+def collect_image_urls(row):
+    """Satırdaki görsel linklerini sırayı koruyarak ve tekrarları atarak döndürür"""
+    urls = []
+    for col in IMAGE_COLUMNS:
+        value = row.get(col)
+        if isinstance(value, str) and value.strip():
+            urls.append(value.strip())
+    other = row.get(OTHER_IMAGES_COLUMN)
+    if isinstance(other, str) and other.strip():
+        urls.extend(url.strip() for url in other.split(',') if url.strip())
+    return list(dict.fromkeys(urls))
+
+def build_tasks(df):
+    """(relative_path, url) listesi: product_images/<Product ID>/image_N.jpg"""
+    tasks = []
+    for _, row in df.iterrows():
+        product_id = row.get('Product ID')
+        if pd.isna(product_id):
+            continue
+        product_id = str(int(product_id)) if isinstance(product_id, float) else str(product_id).strip()
+        for n, url in enumerate(collect_image_urls(row), 1):
+            tasks.append((os.path.join(product_id, f'image_{n}.jpg'), url))
+    return tasks
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError:
+        print(f"⚠️  {MANIFEST_FILE} okunamadı, yeniden oluşturulacak")
+        return {}
+
+def save_manifest(manifest):
+    """Manifest'i önce geçici dosyaya yazıp atomik olarak yerine koyar"""
+    tmp_file = MANIFEST_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_file, MANIFEST_FILE)
+
+def remote_matches(url, size, etag=None):
+    """Sunucudaki görsel bilinen içerikle aynı mı: (eşleşme, sunucunun ETag'i)
+
+    İki tarafta da ETag varsa o karşılaştırılır, yoksa Content-Length boyutla.
+    """
+    response = http_client.head(url)
+    if response.status_code != 200:
+        return False, None
+    remote_etag = response.headers.get('ETag')
+    if etag and remote_etag:
+        return remote_etag == etag, remote_etag
+    content_length = response.headers.get('Content-Length')
+    return content_length is not None and int(content_length) == size, remote_etag
+
+def existing_entry(path, url, entry, store):
+    """Dosya zaten varsa ve boyutu (manifest'teki veya sunucudaki) tutuyorsa manifest kaydını döndürür
+    
+    Depoya henüz alınmamış dosyalar bu sırada depoya alınır ve hardlink'e çevrilir.
+    """
+    if not os.path.exists(path):
+        return None
+    size = os.path.getsize(path)
+    if entry:
+        if entry.get('url') != url:
+            return None  # Veri setindeki URL değişmiş: görsel her zaman yeniden indirilir
+        if entry.get('size') != size:
+            return None
+        if not entry.get('sha256'):
+            entry = dict(entry, sha256=store.adopt(path))
+            store.record(url, entry['sha256'], size, entry.get('etag'))
+        return entry
+
+    # Manifest'te kaydı olmayan mevcut dosya: sunucudaki boyutla karşılaştır, ETag'i kaydet
+    matches, etag = remote_matches(url, size)
+    if not matches:
+        return None
+    sha256 = store.adopt(path)
+    store.record(url, sha256, size, etag)
+    return {'url': url, 'size': size, 'etag': etag, 'sha256': sha256, 'downloaded_at': None}
+
+def read_part_info(part_info_path):
+    """Yarım indirmenin URL / ETag bilgisini okur"""
+    if not os.path.exists(part_info_path):
+        return {}
+    try:
+        with open(part_info_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+def download_image(relative_path, url, entry, store):
+    """Tek bir görseli indirir; (durum, manifest kaydı) döndürür"""
+    path = os.path.join(OUTPUT_DIR, relative_path)
+    current = existing_entry(path, url, entry, store)
+    if current is not None:
+        return 'skipped', current
+
+    # URL daha önce (başka bir üründe) indirildiyse ağa gitmeden blob'a bağla
+    known = store.lookup(url)
+    if known is not None:
+        store.link(known['sha256'], path)
+        return 'linked', dict(known, url=url, downloaded_at=None)
+
+    # Sadece önbellek kırıcı parametresi farklı bir varyant indirildiyse: parametre genelde
+    # görsel değişince değişir, blob ancak sunucudaki ETag / boyut tutuyorsa kullanılır
+    variant = store.lookup_variant(url)
+    if variant is not None:
+        matches, etag = remote_matches(url, variant['size'], variant['etag'])
+        if matches:
+            store.link(variant['sha256'], path)
+            store.record(url, variant['sha256'], variant['size'], etag)
+            return 'linked', {'url': url, 'size': variant['size'], 'etag': etag,
+                              'sha256': variant['sha256'], 'downloaded_at': None}
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    part_path = path + '.part'
+    part_info_path = part_path + '.json'
+    headers = {}
+    offset = 0
+
+    # Yarım kalan indirme: aynı URL ve güçlü ETag ise Range ile kaldığı yerden devam et
+    partial = read_part_info(part_info_path)
+    if os.path.exists(part_path) and partial.get('url') == url and partial.get('etag'):
+        offset = os.path.getsize(part_path)
+        headers['Range'] = f'bytes={offset}-'
+        headers['If-Range'] = partial['etag']
+
+    response = http_client.stream(url, headers=headers)
+    if response.status_code == 416 and offset:
+        # .part tamamen inmiş ama depoya alınmadan çökülmüş olabilir: sunucunun
+        # Content-Range'deki (bytes */<boyut>) toplam boyutu .part ile aynıysa dosya tamdır
+        total = response.headers.get('Content-Range', '').rpartition('/')[2]
+        response.close()
+        if not (total.isdigit() and int(total) == offset):
+            # Boyut bilinmiyor veya farklı: .part atılır, baştan indirilir
+            os.remove(part_path)
+            os.remove(part_info_path)
+            return download_image(relative_path, url, entry, store)
+        digest = hashlib.sha256()
+        etag = partial['etag']
+        with open(part_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return store_download(store, path, part_path, part_info_path, url, digest, etag, offset)
+
+    try:
+        response.raise_for_status()
+        digest = hashlib.sha256()
+        if response.status_code == 206:
+            mode = 'ab'
+            etag = partial['etag']
+            # Hash'e daha önce indirilmiş kısmı da kat
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        else:
+            # Sunucu Range'i desteklemiyor veya dosya değişmiş: baştan indir
+            mode = 'wb'
+            offset = 0
+            etag = response.headers.get('ETag')
+            if etag and etag.startswith('W/'):
+                etag = None  # Zayıf ETag ile Range isteği güvenli değil
+            with open(part_info_path, 'w', encoding='utf-8') as f:
+                json.dump({'url': url, 'etag': etag}, f)
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+                    digest.update(chunk)
+    finally:
+        response.close()
+    return store_download(store, path, part_path, part_info_path, url, digest, etag, offset)
+
+def store_download(store, path, part_path, part_info_path, url, digest, etag, offset):
+    """Tamamlanan .part'ı depoya alır (aynı içerik zaten varsa yenisi silinir) ve image_N.jpg'yi ona bağlar"""
+    size = os.path.getsize(part_path)
+    sha256 = store.add(part_path, digest.hexdigest())
+    store.link(sha256, path)
+    store.record(url, sha256, size, etag)
+    if os.path.exists(part_info_path):
+        os.remove(part_info_path)
+    return 'downloaded', {
+        'url': url,
+        'size': size,
+        'etag': etag,
+        'sha256': sha256,
+        'resumed_from': offset or None,
+        'downloaded_at': time.time()
+    }
+
+def main():
+    print("Veri seti okunuyor...")
+    df = DatasetStore(DATASET, EXCEL_FILE).load()
+
+    if 'Product ID' not in df.columns:
+        print("Hata: 'Product ID' sütunu bulunamadı!")
+        print(f"Mevcut sütunlar: {df.columns.tolist()}")
+        return
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    manifest = load_manifest()
+    store = ImageStore(STORE_DIR)
+    tasks = build_tasks(df)
+    total = len(tasks)
+    print(f"Toplam {total} görsel bulundu, {MAX_WORKERS} paralel indirme ile işlenecek.\n")
+
+    stats = {'downloaded': 0, 'linked': 0, 'skipped': 0, 'failed': 0}
+    task_iter = iter(tasks)
+    done_count = 0
+
+    # Tüm görevleri bir kerede kuyruğa koymak yerine sınırlı sayıda görev uçuşta tutulur
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        in_flight = {}
+
+        def submit_next():
+            for relative_path, url in task_iter:
+                future = executor.submit(download_image, relative_path, url, manifest.get(relative_path), store)
+                in_flight[future] = (relative_path, url)
+                return True
+            return False
+
+        for _ in range(MAX_WORKERS * 4):
+            if not submit_next():
+                break
+
+        try:
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    relative_path, url = in_flight.pop(future)
+                    done_count += 1
+                    try:
+                        status, entry = future.result()
+                        manifest[relative_path] = entry
+                        stats[status] += 1
+                        if status == 'downloaded':
+                            print(f"[{done_count}/{total}] ✓ {relative_path} ({entry['size']} byte)")
+                    except Exception as e:
+                        # Yarım dosya .part olarak kalır, sonraki çalıştırmada Range ile devam edilir
+                        stats['failed'] += 1
+                        print(f"[{done_count}/{total}] ✗ {relative_path}: {str(e)}")
+
+                    if done_count % MANIFEST_SAVE_INTERVAL == 0:
+                        save_manifest(manifest)
+                    submit_next()
+        except KeyboardInterrupt:
+            print("\n⚠️  Durduruldu, manifest kaydediliyor...")
+            for future in in_flight:
+                future.cancel()
+
+    save_manifest(manifest)
+    print(f"\n✅ Manifest güncellendi: {MANIFEST_FILE}")
+
+    # Özet
+    print("\n" + "="*60)
+    print("ÖZET")
+    print("="*60)
+    print(f"İndirilen: {stats['downloaded']}")
+    print(f"Depodan bağlanan (indirilmeden): {stats['linked']}")
+    print(f"Zaten mevcut: {stats['skipped']}")
+    store_stats = store.stats()
+    print(f"Depo: {store_stats['urls']} URL, {store_stats['blobs']} benzersiz görsel")
+    print(f"Başarısız: {stats['failed']}")
+    print(f"Toplam: {total}")
+    print(f"HTTP: {http_client.format_metrics()}")
+
+if __name__ == '__main__':
+    main()
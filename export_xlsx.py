@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Veri deposundaki (.data/) veri setlerini xlsx olarak dışa aktaran script
+
+Scriptler çalışma verisini Parquet deposunda tutar; xlsx dosyası sadece
+bu adımla üretilir.
+
+Kullanım:
+    python export_xlsx.py [VERİ_SETİ ...]           depodan xlsx yazar (varsayılan: hepsi)
+    python export_xlsx.py --import [VERİ_SETİ ...]  elle düzenlenmiş xlsx'i depoya geri aktarır
+"""
+
+import os
+import sys
+
+from common.dataset_store import DatasetStore
+
+# Ayarlar
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASETS = {  # Veri seti adı -> xlsx dosyası (depo kökünden)
+    'technopolis': 'Technopolis_Tum_Urunler_20250917_164841_Brands_Translated_NoDuplicates (1).xlsx',
+    'technomarket': os.path.join('technomarket', 'TechnoMarket_Urunler.xlsx'),
+    'technomarket_urls': os.path.join('technomarket', 'Product_URLs.xlsx'),
+}
+
+def main():
+    args = sys.argv[1:]
+    import_mode = '--import' in args
+    names = [arg for arg in args if not arg.startswith('--')] or list(DATASETS)
+
+    unknown = [name for name in names if name not in DATASETS]
+    if unknown:
+        print(f"❌ Bilinmeyen veri seti: {', '.join(unknown)}")
+        print(f"Mevcut veri setleri: {', '.join(DATASETS)}")
+        return
+
+    print("xlsx içe aktarma" if import_mode else "xlsx dışa aktarma")
+    print("="*60)
+    stats = {'done': 0, 'skipped': 0, 'failed': 0}
+    for name in names:
+        store = DatasetStore(name, os.path.join(ROOT_DIR, DATASETS[name]))
+        source = store.xlsx_path if import_mode else store.data_path
+        if not os.path.exists(source):
+            print(f"⏭️  {name}: {source} bulunamadı, atlanıyor")
+            stats['skipped'] += 1
+            continue
+        try:
+            if import_mode:
+                df = store.import_xlsx()
+                print(f"✅ {name}: {len(df)} satır depoya aktarıldı ({store.data_path})")
+            else:
+                path = store.export_xlsx()
+                print(f"✅ {name}: {path}")
+            stats['done'] += 1
+        except Exception as e:
+            print(f"❌ {name}: {str(e)}")
+            stats['failed'] += 1
+
+    # Özet
+    print("\n" + "="*60)
+    print("ÖZET")
+    print("="*60)
+    print(f"Başarılı: {stats['done']}")
+    print(f"Atlanan: {stats['skipped']}")
+    print(f"Başarısız: {stats['failed']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,14 +4,16 @@
 Diğer görseller sütunu boş olan satırları silen script
 """
 
-import pandas as pd
+from common.dataset_store import DatasetStore
 
 # Ayarlar
 EXCEL_FILE = 'Technopolis_Tum_Urunler_20250917_164841_Brands_Translated_NoDuplicates (1).xlsx'
+DATASET = 'technopolis'  # Veri deposundaki adı (xlsx sadece export_xlsx.py ile üretilir)
 
 def main():
-    print("Excel dosyası okunuyor...")
-    df = pd.read_excel(EXCEL_FILE)
+    print("Veri deposu okunuyor...")
+    store = DatasetStore(DATASET, EXCEL_FILE)
+    df = store.load()
     
     original_count = len(df)
     print(f"Orijinal satır sayısı: {original_count}")
@@ -40,11 +42,12 @@ def main():
     print(f"Kalan satır sayısı: {len(df_filtered)}")
     
     if removed_count > 0:
-        # Excel dosyasını güncelle
-        print("\nExcel dosyası güncelleniyor...")
-        df_filtered.to_excel(EXCEL_FILE, index=False)
-        print(f"✅ Excel dosyası güncellendi: {EXCEL_FILE}")
+        # Veri deposunu güncelle
+        print("\nVeri deposu güncelleniyor...")
+        store.save(df_filtered)
+        print(f"✅ Veri deposu güncellendi: {store.data_path}")
         print(f"✅ {removed_count} satır silindi, {len(df_filtered)} satır kaldı")
+        print(f"   (xlsx için: python export_xlsx.py {DATASET})")
     else:
         print("\n⚠️  Silinecek boş satır bulunamadı.")
 
@@ -1,23 +1,30 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Technopolis ürün URL'lerinden görselleri çeken ve Excel'e link olarak yazan script
+Technopolis ürün URL'lerinden görselleri çeken ve veri setine link olarak yazan script
 """
 
-import pandas as pd
-import requests
 from bs4 import BeautifulSoup
-import time
 from urllib.parse import urljoin, urlparse, urlunparse
 import json
 import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from common import html_parser, http_client, metrics
+from common.dataset_store import DatasetStore
+from common.journal import ProgressJournal
 
 # Ayarlar
 EXCEL_FILE = 'Technopolis_Tum_Urunler_20250917_164841_Brands_Translated_NoDuplicates (1).xlsx'
-DELAY = 1  # Her istek arasında bekleme süresi (saniye)
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
+DATASET = 'technopolis'  # Veri deposundaki adı (xlsx sadece dışa aktarmada yazılır)
+JOURNAL_FILE = 'scrape_images_journal.jsonl'  # Her ürünün sonucu anında buraya eklenir
+METRICS_FILE = 'scrape_images_metrics.prom'  # Aşama süreleri, hız ve ETA (düzenli olarak yazılır)
+PER_HOST_LIMIT = 4  # Aynı host'a aynı anda açılabilecek en fazla istek
+MAX_WORKERS = PER_HOST_LIMIT  # Eşzamanlı çalışan istek sayısı (1 = sıralı mod); tüm sayfalar tek host'ta
+HTML_PARSER = html_parser.soup_builder('product')  # BeautifulSoup parser backend'i (lxml varsa lxml)
+FAST_PATH = True  # cx-state JSON'u varsa DOM kurmadan görselleri al
 
 def convert_to_full_size_image(img_url):
     """Thumbnail veya küçük görsel URL'ini orijinal büyük görsele çevirir"""
@@ -65,288 +72,483 @@ def convert_to_full_size_image(img_url):
     
     return img_url
 
-def get_images_from_url(url):
-    """Verilen URL'den ürün görsellerini çeker"""
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        images = []
-        
-        # Farklı görsel kaynaklarını dene
-        
-        # 0. ÖNCE: Modal/Gallery için data attribute'larını kontrol et (büyük görseller için)
-        # data-zoom-url, data-large-url, data-full-url, data-original gibi attribute'ları ara
-        for img in soup.find_all(['img', 'a', 'div'], attrs=lambda x: x and any(key in x for key in ['data-zoom-url', 'data-large-url', 'data-full-url', 'data-original', 'data-zoom', 'data-lightbox', 'data-gallery-url', 'data-href'])):
-            for attr in ['data-zoom-url', 'data-large-url', 'data-full-url', 'data-original', 'data-zoom', 'data-lightbox', 'data-gallery-url', 'data-href']:
-                large_url = img.get(attr)
-                if large_url:
-                    images.append(large_url)
-        
-        # 0.1: Gallery modal için özel attribute'lar
-        gallery_items = soup.find_all(attrs={'data-image': True}) + soup.find_all(attrs={'data-thumb': True})
-        for item in gallery_items:
-            if item.get('data-image'):
-                images.append(item.get('data-image'))
-            if item.get('data-thumb'):
-                # data-thumb genelde küçük görseldir, ama bazen data-image ile birlikte gelir
+# Büyük görsel linki taşıyabilen data attribute'ları (modal/gallery)
+LARGE_IMAGE_ATTRS = ['data-zoom-url', 'data-large-url', 'data-full-url', 'data-original', 'data-zoom', 'data-lightbox', 'data-gallery-url', 'data-href']
+IMAGE_URL_KEYWORDS = ['product', 'gallery', 'main', 'zoom', 'big', 'large']
+
+# Script içindeki görsel dizileri için pattern'ler (bir kere derlenir)
+SCRIPT_ARRAY_PATTERNS = [
+    re.compile(r'(?:images|productImages|gallery|media|productMedia)\s*[:=]\s*\[(.*?)\]', re.IGNORECASE | re.DOTALL),
+    re.compile(r'(?:zoom|large|full)Images\s*[:=]\s*\[(.*?)\]', re.IGNORECASE | re.DOTALL),
+]
+ABSOLUTE_URL_PATTERN = re.compile(r'["\'](https?://[^"\']+)["\']')
+RELATIVE_IMAGE_PATTERN = re.compile(r'["\'](/[^"\']+\.(?:jpg|jpeg|png|webp|gif))["\']', re.IGNORECASE)
+JSON_PARSE_PATTERN = re.compile(r'JSON\.parse\(["\'](.*?)["\']\)', re.DOTALL)
+
+# Hızlı yol: ham yanıt içindeki application/json script'leri (cx-state blob'u için)
+JSON_SCRIPT_PATTERN = re.compile(rb'<script[^>]*type=["\']application/json["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+CX_STATE_MARKER = b'"cx-state"'
+# Akış modunda okuma cx-state script'i kapanınca kesilir (hızlı yol için yeterli);
+# blob 64KB'ı aşabildiği için kapanış etiketi başlangıç işaretinden itibaren aranır
+CX_STATE_COMPLETE_PATTERNS = [(re.compile(re.escape(CX_STATE_MARKER)), re.compile(rb'</script>'))]
+
+def largest_srcset_url(srcset):
+    """srcset içindeki en büyük görseli ve tüm URL'leri döndürür: (largest_url, urls)"""
+    largest_url = None
+    largest_size = 0
+    urls = []
+    for item in srcset.split(','):
+        parts = item.strip().split()
+        if not parts:
+            continue
+        url_part = parts[0]
+        urls.append(url_part)
+        # Boyut bilgisini al (varsa)
+        size = 0
+        if len(parts) > 1:
+            try:
+                size = int(re.sub(r'[^0-9]', '', parts[1]))
+            except:
                 pass
+        if size > largest_size:
+            largest_size = size
+            largest_url = url_part
+    return largest_url, urls
+
+def collect_image_candidates(soup):
+    """Ağacı tek seferde dolaşır ve her elemanı tüm görsel toplayıcılarına gönderir.
+    
+    Eski sürümdeki gibi kaynak başına ayrı find_all taraması yapılmaz; sonuçlar
+    kaynak türüne göre ayrı listelerde tutulur ki öncelik sırası korunsun.
+    """
+    data_attr_images = []    # 0: data-zoom-url, data-large-url ...
+    data_image_items = []    # 0.1: data-image
+    pictures = []            # 2: picture > source/img
+    picture_by_id = {}
+    lazy_images = []         # 3: img[data-src]
+    keyword_images = []      # 4: anahtar kelime içeren img src'leri
+    json_scripts = []        # 5.1: script[type=application/json]
+    script_texts = []        # 5.2: tüm script'ler
+    
+    for tag in soup.descendants:
+        name = tag.name
+        if name is None:
+            continue
         
-        # 1. img etiketlerini kontrol et (product images için)
-        product_images = soup.find_all('img', class_=lambda x: x and ('product' in x.lower() or 'gallery' in x.lower() or 'main' in x.lower()))
-        
-        # 2. picture source etiketlerini kontrol et
-        picture_tags = soup.find_all('picture')
-        for picture in picture_tags:
-            source_tags = picture.find_all('source')
-            img_tags = picture.find_all('img')
-            for source in source_tags:
-                if source.get('srcset'):
-                    # srcset'teki tüm görselleri al, en büyük olanı seç
-                    srcset_items = source.get('srcset').split(',')
-                    # En büyük görseli bul (genişlik değerine göre)
-                    largest_url = None
-                    largest_size = 0
-                    for item in srcset_items:
-                        parts = item.strip().split()
-                        url_part = parts[0]
-                        # Boyut bilgisini al (varsa)
-                        size = 0
-                        if len(parts) > 1:
-                            try:
-                                size = int(re.sub(r'[^0-9]', '', parts[1]))
-                            except:
-                                pass
-                        if size > largest_size:
-                            largest_size = size
-                            largest_url = url_part
-                    if largest_url:
-                        images.append(largest_url)
-                    else:
-                        # Boyut bilgisi yoksa, tüm URL'leri ekle
-                        images.extend([src.split()[0] for src in srcset_items])
-            for img in img_tags:
-                # img etiketlerinde srcset varsa, en büyük olanı seç
-                if img.get('srcset'):
-                    srcset_items = img.get('srcset').split(',')
-                    largest_url = None
-                    largest_size = 0
-                    for item in srcset_items:
-                        parts = item.strip().split()
-                        url_part = parts[0]
-                        size = 0
-                        if len(parts) > 1:
-                            try:
-                                size = int(re.sub(r'[^0-9]', '', parts[1]))
-                            except:
-                                pass
-                        if size > largest_size:
-                            largest_size = size
-                            largest_url = url_part
-                    if largest_url:
-                        images.append(largest_url)
-                if img.get('src'):
-                    images.append(img.get('src'))
-                if img.get('data-src'):
-                    images.append(img.get('data-src'))
+        if name in ('img', 'a', 'div'):
+            # Eski sürümle aynı çıktı: oradaki find_all(attrs=lambda ...) filtresi BeautifulSoup'ta
+            # class değerine uygulanıyordu, yani bu attribute'lar sadece class'ında bu adlardan
+            # biri geçen elemanlarda okunur
+            classes = ' '.join(tag.get('class') or [])
+            if classes and any(attr in classes for attr in LARGE_IMAGE_ATTRS):
+                for attr in LARGE_IMAGE_ATTRS:
+                    large_url = tag.get(attr)
+                    if large_url:
+                        data_attr_images.append(large_url)
         
-        # 3. data-src veya lazy-loaded görseller
-        lazy_images = soup.find_all('img', {'data-src': True})
-        for img in lazy_images:
-            images.append(img.get('data-src'))
+        if tag.get('data-image'):
+            data_image_items.append(tag.get('data-image'))
         
-        # 4. Genel img etiketleri (yüksek çözünürlüklü olanları)
-        all_images = soup.find_all('img')
-        for img in all_images:
-            src = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-            if src and any(keyword in src.lower() for keyword in ['product', 'gallery', 'main', 'zoom', 'big', 'large']):
-                if src not in images:
-                    images.append(src)
+        if name == 'picture':
+            entry = {'sources': [], 'imgs': []}
+            picture_by_id[id(tag)] = entry
+            pictures.append(entry)
+        elif name == 'source' or name == 'img':
+            parent = tag.find_parent('picture')
+            if parent is not None and id(parent) in picture_by_id:
+                entry = picture_by_id[id(parent)]
+                if name == 'source':
+                    if tag.get('srcset'):
+                        # srcset'teki en büyük görseli seç, boyut bilgisi yoksa tümünü ekle
+                        largest_url, urls = largest_srcset_url(tag.get('srcset'))
+                        entry['sources'].extend([largest_url] if largest_url else urls)
+                else:
+                    if tag.get('srcset'):
+                        largest_url, _ = largest_srcset_url(tag.get('srcset'))
+                        if largest_url:
+                            entry['imgs'].append(largest_url)
+                    if tag.get('src'):
+                        entry['imgs'].append(tag.get('src'))
+                    if tag.get('data-src'):
+                        entry['imgs'].append(tag.get('data-src'))
         
-        # 5. JavaScript'te embed edilmiş görseller (API çağrıları vb)
-        # 5.1: application/json type script'ler - Technopolis özel yapısı
-        scripts = soup.find_all('script', type='application/json')
-        for script in scripts:
+        if name == 'img':
+            if tag.get('data-src'):
+                lazy_images.append(tag.get('data-src'))
+            src = tag.get('src') or tag.get('data-src') or tag.get('data-lazy-src')
+            if src and any(keyword in src.lower() for keyword in IMAGE_URL_KEYWORDS):
+                keyword_images.append(src)
+        elif name == 'script':
+            if tag.get('type') == 'application/json':
+                json_scripts.append(tag.string)
+            if tag.string:
+                script_texts.append(tag.string)
+    
+    images = data_attr_images + data_image_items
+    for entry in pictures:
+        images.extend(entry['sources'])
+        images.extend(entry['imgs'])
+    images.extend(lazy_images)
+    for src in keyword_images:
+        if src not in images:
+            images.append(src)
+    
+    return images, json_scripts, script_texts
+
+def extract_cx_state_images(data):
+    """Technopolis cx-state yapısından zoom görsellerini döndürür
+    
+    Yapı: cx-state.product.details.entities.{productId}.variants.value.images
+    (PRIMARY için videoluxZoom, yoksa videoluxProduct; GALLERY için sadece videoluxZoom)
+    """
+    images = []
+    if not isinstance(data, dict) or not isinstance(data.get('cx-state'), dict):
+        return images
+    if 'product' not in data['cx-state']:
+        return images
+    
+    product_state = data['cx-state'].get('product', {})
+    if 'details' in product_state and 'entities' in product_state['details']:
+        for product_id, product_data in product_state['details']['entities'].items():
             try:
-                data = json.loads(script.string)
-                if isinstance(data, dict):
-                    # Technopolis özel yapısı: cx-state.product.details.entities.{productId}.variants.value.images.GALLERY
-                    if 'cx-state' in data and 'product' in data['cx-state']:
-                        product_state = data['cx-state'].get('product', {})
-                        if 'details' in product_state and 'entities' in product_state['details']:
-                            for product_id, product_data in product_state['details']['entities'].items():
-                                try:
-                                    if 'variants' in product_data and 'value' in product_data['variants']:
-                                        variants = product_data['variants']['value']
-                                        if 'images' in variants:
-                                            # PRIMARY görseli (ana görsel) - zoom formatını kullan
-                                            if 'PRIMARY' in variants['images']:
-                                                primary = variants['images']['PRIMARY']
-                                                if isinstance(primary, dict) and 'videoluxZoom' in primary:
-                                                    zoom_url = primary['videoluxZoom'].get('url')
-                                                    if zoom_url:
-                                                        images.append(zoom_url)
-                                                # Fallback: videoluxProduct
-                                                elif isinstance(primary, dict) and 'videoluxProduct' in primary:
-                                                    prod_url = primary['videoluxProduct'].get('url')
-                                                    if prod_url:
-                                                        images.append(prod_url)
-                                            
-                                            # GALLERY görselleri - sadece zoom formatındakileri al
-                                            if 'GALLERY' in variants['images']:
-                                                gallery = variants['images']['GALLERY']
-                                                if isinstance(gallery, list):
-                                                    for gallery_item in gallery:
-                                                        if isinstance(gallery_item, dict):
-                                                            # Sadece videoluxZoom'u al (büyük görsel)
-                                                            if 'videoluxZoom' in gallery_item:
-                                                                zoom_url = gallery_item['videoluxZoom'].get('url')
-                                                                if zoom_url:
-                                                                    images.append(zoom_url)
-                                except:
-                                    pass
-                    
-                    # Genel nested structure kontrolü (fallback)
-                    def extract_urls(obj, urls_list):
-                        if isinstance(obj, dict):
-                            for key, value in obj.items():
-                                if 'image' in key.lower() or 'photo' in key.lower() or 'img' in key.lower() or 'media' in key.lower() or 'gallery' in key.lower():
-                                    if isinstance(value, str) and (value.startswith('http') or value.startswith('//')):
-                                        urls_list.append(value)
-                                    elif isinstance(value, list):
-                                        for item in value:
-                                            if isinstance(item, str) and (item.startswith('http') or item.startswith('//')):
-                                                urls_list.append(item)
-                                extract_urls(value, urls_list)
-                        elif isinstance(obj, list):
-                            for item in obj:
-                                extract_urls(item, urls_list)
-                    
-                    # Eğer Technopolis yapısında görsel bulunamadıysa, genel arama yap
-                    if not any('technopolis.bg' in img for img in images):
-                        extract_urls(data, images)
+                if 'variants' in product_data and 'value' in product_data['variants']:
+                    variants = product_data['variants']['value']
+                    if 'images' in variants:
+                        # PRIMARY görseli (ana görsel) - zoom formatını kullan
+                        if 'PRIMARY' in variants['images']:
+                            primary = variants['images']['PRIMARY']
+                            if isinstance(primary, dict) and 'videoluxZoom' in primary:
+                                zoom_url = primary['videoluxZoom'].get('url')
+                                if zoom_url:
+                                    images.append(zoom_url)
+                            # Fallback: videoluxProduct
+                            elif isinstance(primary, dict) and 'videoluxProduct' in primary:
+                                prod_url = primary['videoluxProduct'].get('url')
+                                if prod_url:
+                                    images.append(prod_url)
+                        
+                        # GALLERY görselleri - sadece zoom formatındakileri al
+                        if 'GALLERY' in variants['images']:
+                            gallery = variants['images']['GALLERY']
+                            if isinstance(gallery, list):
+                                for gallery_item in gallery:
+                                    if isinstance(gallery_item, dict):
+                                        # Sadece videoluxZoom'u al (büyük görsel)
+                                        if 'videoluxZoom' in gallery_item:
+                                            zoom_url = gallery_item['videoluxZoom'].get('url')
+                                            if zoom_url:
+                                                images.append(zoom_url)
             except:
                 pass
-        
-        # 5.2: Tüm script tag'lerinde product images array'lerini ara
-        all_scripts = soup.find_all('script')
-        for script in all_scripts:
-            if not script.string:
-                continue
-            script_text = script.string
-            
-            # JavaScript object'lerinde product images array'lerini ara
-            # Pattern: images: [...], productImages: [...], gallery: [...], media: [...]
-            patterns = [
-                r'(?:images|productImages|gallery|media|productMedia)\s*[:=]\s*\[(.*?)\]',
-                r'(?:zoom|large|full)Images\s*[:=]\s*\[(.*?)\]',
-            ]
+    return images
+
+def extract_images_fast(content, url):
+    """BeautifulSoup ağacı kurmadan, ham yanıttaki cx-state JSON'undan görselleri çıkarır
+    
+    cx-state bulunamazsa veya içinde görsel yoksa None döndürür (tam çıkarıcıya düşülür).
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    if CX_STATE_MARKER not in content:
+        return None
+    
+    for match in JSON_SCRIPT_PATTERN.finditer(content):
+        blob = match.group(1)
+        if CX_STATE_MARKER not in blob:
+            continue
+        try:
+            data = json.loads(blob)
+        except ValueError:
+            continue
+        images = extract_cx_state_images(data)
+        if images:
+            return normalize_image_urls(images, url)
+    return None
+
+def extract_images_from_json_script(script_string, images):
+    """application/json script'indeki görselleri images listesine ekler"""
+    try:
+        data = json.loads(script_string)
+        if isinstance(data, dict):
+            # Technopolis özel yapısı: cx-state.product.details.entities.{productId}.variants.value.images.GALLERY
+            images.extend(extract_cx_state_images(data))
             
-            for pattern in patterns:
-                matches = re.finditer(pattern, script_text, re.IGNORECASE | re.DOTALL)
-                for match in matches:
-                    array_content = match.group(1)
-                    # URL'leri çıkar
-                    url_matches = re.findall(r'["\'](https?://[^"\']+)["\']', array_content)
-                    images.extend(url_matches)
-                    # Göreceli URL'ler için
-                    rel_urls = re.findall(r'["\'](/[^"\']+\.(?:jpg|jpeg|png|webp|gif))["\']', array_content, re.IGNORECASE)
-                    images.extend(rel_urls)
+            # Genel nested structure kontrolü (fallback)
+            def extract_urls(obj, urls_list):
+                if isinstance(obj, dict):
+                    for key, value in obj.items():
+                        if 'image' in key.lower() or 'photo' in key.lower() or 'img' in key.lower() or 'media' in key.lower() or 'gallery' in key.lower():
+                            if isinstance(value, str) and (value.startswith('http') or value.startswith('//')):
+                                urls_list.append(value)
+                            elif isinstance(value, list):
+                                for item in value:
+                                    if isinstance(item, str) and (item.startswith('http') or item.startswith('//')):
+                                        urls_list.append(item)
+                        extract_urls(value, urls_list)
+                elif isinstance(obj, list):
+                    for item in obj:
+                        extract_urls(item, urls_list)
             
-            # JSON.parse() içindeki verileri ara
-            json_matches = re.finditer(r'JSON\.parse\(["\'](.*?)["\']\)', script_text, re.DOTALL)
-            for json_match in json_matches:
-                try:
-                    json_str = json_match.group(1).replace('\\"', '"').replace("\\'", "'")
-                    json_data = json.loads(json_str)
-                    def extract_from_obj(obj):
-                        if isinstance(obj, dict):
-                            for key, val in obj.items():
-                                if any(kw in key.lower() for kw in ['image', 'gallery', 'media', 'zoom', 'large']):
-                                    if isinstance(val, str) and ('http' in val or val.startswith('/')):
-                                        images.append(val)
-                                    elif isinstance(val, list):
-                                        for item in val:
-                                            if isinstance(item, str) and ('http' in item or item.startswith('/')):
-                                                images.append(item)
-                                extract_from_obj(val)
-                        elif isinstance(obj, list):
-                            for item in obj:
-                                extract_from_obj(item)
-                    extract_from_obj(json_data)
-                except:
-                    pass
+            # Eğer Technopolis yapısında görsel bulunamadıysa, genel arama yap
+            if not any('technopolis.bg' in img for img in images):
+                extract_urls(data, images)
+    except:
+        pass
+
+def extract_images_from_script_text(script_text, images):
+    """JavaScript metnindeki görsel dizilerini ve JSON.parse verilerini images listesine ekler"""
+    # JavaScript object'lerinde product images array'lerini ara
+    # Pattern: images: [...], productImages: [...], gallery: [...], media: [...]
+    for pattern in SCRIPT_ARRAY_PATTERNS:
+        for match in pattern.finditer(script_text):
+            array_content = match.group(1)
+            # URL'leri çıkar
+            images.extend(ABSOLUTE_URL_PATTERN.findall(array_content))
+            # Göreceli URL'ler için
+            images.extend(RELATIVE_IMAGE_PATTERN.findall(array_content))
+    
+    # JSON.parse() içindeki verileri ara
+    for json_match in JSON_PARSE_PATTERN.finditer(script_text):
+        try:
+            json_str = json_match.group(1).replace('\\"', '"').replace("\\'", "'")
+            json_data = json.loads(json_str)
+            def extract_from_obj(obj):
+                if isinstance(obj, dict):
+                    for key, val in obj.items():
+                        if any(kw in key.lower() for kw in ['image', 'gallery', 'media', 'zoom', 'large']):
+                            if isinstance(val, str) and ('http' in val or val.startswith('/')):
+                                images.append(val)
+                            elif isinstance(val, list):
+                                for item in val:
+                                    if isinstance(item, str) and ('http' in item or item.startswith('/')):
+                                        images.append(item)
+                        extract_from_obj(val)
+                elif isinstance(obj, list):
+                    for item in obj:
+                        extract_from_obj(item)
+            extract_from_obj(json_data)
+        except:
+            pass
+
+def normalize_image_urls(images, url):
+    """Ham görsel listesini mutlak URL'lere çevirir, filtreler, önceliklendirir (en fazla 10)"""
+    # URL'leri normalize et
+    normalized_images = []
+    base_url = f"{urlparse(url).scheme}://{urlparse(url).netloc}"
+    
+    for img_url in images:
+        if not img_url:
+            continue
+        # Göreceli URL'leri mutlak URL'lere çevir
+        if img_url.startswith('//'):
+            img_url = f"{urlparse(url).scheme}:{img_url}"
+        elif img_url.startswith('/'):
+            img_url = urljoin(base_url, img_url)
+        elif not img_url.startswith('http'):
+            img_url = urljoin(url, img_url)
         
-        # URL'leri normalize et
-        normalized_images = []
-        base_url = f"{urlparse(url).scheme}://{urlparse(url).netloc}"
+        # Tekrarları temizle ve geçerli görselleri filtrele
+        if img_url not in normalized_images and any(ext in img_url.lower() for ext in ['.jpg', '.jpeg', '.png', '.webp', '.gif']):
+            normalized_images.append(img_url)
+    
+    # Logo, icon gibi görselleri filtrele ve küçük görselleri büyük versiyonlarına çevir
+    filtered_images = []
+    exclude_keywords = ['logo', 'icon', 'banner', 'placeholder', 'blank', 'no-image', 'social']
+    
+    for img_url in normalized_images:
+        # product-gallery içerenleri at
+        if 'product-gallery' in img_url.lower():
+            continue
         
-        for img_url in images:
-            if not img_url:
-                continue
-            # Göreceli URL'leri mutlak URL'lere çevir
-            if img_url.startswith('//'):
-                img_url = f"{urlparse(url).scheme}:{img_url}"
-            elif img_url.startswith('/'):
-                img_url = urljoin(base_url, img_url)
-            elif not img_url.startswith('http'):
-                img_url = urljoin(url, img_url)
+        if not any(keyword in img_url.lower() for keyword in exclude_keywords):
+            # videoluxZoom, videoluxProduct, product-zoom ve product-details-main URL'leri zaten büyük görseller, dönüştürme yapma
+            is_videolux_url = ('videoluxzoom' in img_url.lower() or 'videoluxproduct' in img_url.lower() or 
+                               'product-zoom' in img_url.lower() or 'product-details-main' in img_url.lower())
+            
+            if is_videolux_url:
+                # Zaten büyük görsel, direkt ekle
+                full_size_url = img_url
+            else:
+                # Küçük görselleri (thumbnail'ler) orijinal büyük versiyonlarına çevir
+                full_size_url = convert_to_full_size_image(img_url)
             
-            # Tekrarları temizle ve geçerli görselleri filtrele
-            if img_url not in normalized_images and any(ext in img_url.lower() for ext in ['.jpg', '.jpeg', '.png', '.webp', '.gif']):
-                normalized_images.append(img_url)
+            # product-zoom ve product-details-main içerenleri en öncelikli yap
+            if 'product-zoom' in img_url.lower() or 'product-details-main' in img_url.lower() or 'videoluxzoom' in img_url.lower():
+                filtered_images.insert(0, full_size_url)
+            # Ürün görseli gibi görünen URL'leri önceliklendir
+            elif any(keyword in img_url.lower() for keyword in ['product', 'main', 'zoom', 'big', 'large', '/p/', '/products/']):
+                filtered_images.insert(0, full_size_url)
+            else:
+                filtered_images.append(full_size_url)
+    
+    # Tekrarları temizle (aynı görselin farklı boyutları olabilir)
+    unique_images = []
+    seen = set()
+    for img_url in filtered_images:
+        # URL'yi normalize et (protocol, domain olmadan karşılaştır)
+        normalized = urlparse(img_url).path.lower()
+        if normalized not in seen:
+            seen.add(normalized)
+            unique_images.append(img_url)
+    
+    # En fazla 10 görsel döndür
+    return unique_images[:10]
+
+def extract_images_from_html(content, url, parser=None):
+    """Sayfa içeriğinden (bytes/str) ürün görsellerini çıkarır"""
+    with metrics.timer('parse'):
+        soup = BeautifulSoup(content, parser or HTML_PARSER)
+    
+    with metrics.timer('extract'):
+        images, json_scripts, script_texts = collect_image_candidates(soup)
         
-        # Logo, icon gibi görselleri filtrele ve küçük görselleri büyük versiyonlarına çevir
-        filtered_images = []
-        exclude_keywords = ['logo', 'icon', 'banner', 'placeholder', 'blank', 'no-image', 'social']
+        # 5. JavaScript'te embed edilmiş görseller (API çağrıları vb)
+        # 5.1: application/json type script'ler - Technopolis özel yapısı
+        for script_string in json_scripts:
+            extract_images_from_json_script(script_string, images)
         
-        for img_url in normalized_images:
-            # product-gallery içerenleri at
-            if 'product-gallery' in img_url.lower():
-                continue
-            
-            if not any(keyword in img_url.lower() for keyword in exclude_keywords):
-                # videoluxZoom, videoluxProduct, product-zoom ve product-details-main URL'leri zaten büyük görseller, dönüştürme yapma
-                is_videolux_url = ('videoluxzoom' in img_url.lower() or 'videoluxproduct' in img_url.lower() or 
-                                   'product-zoom' in img_url.lower() or 'product-details-main' in img_url.lower())
-                
-                if is_videolux_url:
-                    # Zaten büyük görsel, direkt ekle
-                    full_size_url = img_url
-                else:
-                    # Küçük görselleri (thumbnail'ler) orijinal büyük versiyonlarına çevir
-                    full_size_url = convert_to_full_size_image(img_url)
-                
-                # product-zoom ve product-details-main içerenleri en öncelikli yap
-                if 'product-zoom' in img_url.lower() or 'product-details-main' in img_url.lower() or 'videoluxzoom' in img_url.lower():
-                    filtered_images.insert(0, full_size_url)
-                # Ürün görseli gibi görünen URL'leri önceliklendir
-                elif any(keyword in img_url.lower() for keyword in ['product', 'main', 'zoom', 'big', 'large', '/p/', '/products/']):
-                    filtered_images.insert(0, full_size_url)
-                else:
-                    filtered_images.append(full_size_url)
+        # 5.2: Tüm script tag'lerinde product images array'lerini ara
+        for script_text in script_texts:
+            extract_images_from_script_text(script_text, images)
         
-        # Tekrarları temizle (aynı görselin farklı boyutları olabilir)
-        unique_images = []
-        seen = set()
-        for img_url in filtered_images:
-            # URL'yi normalize et (protocol, domain olmadan karşılaştır)
-            normalized = urlparse(img_url).path.lower()
-            if normalized not in seen:
-                seen.add(normalized)
-                unique_images.append(img_url)
+        return normalize_image_urls(images, url)
+
+def extract_images(content, url):
+    """Önce cx-state hızlı yolunu dener, bulunamazsa tam sezgisel çıkarıcıyı çalıştırır"""
+    if FAST_PATH:
+        with metrics.timer('extract_fast'):
+            images = extract_images_fast(content, url)
+        if images:
+            return images
+    return extract_images_from_html(content, url)
+
+def get_images_from_url(url):
+    """Verilen URL'den ürün görsellerini çeker (istek başarısız olursa None döndürür)"""
+    try:
+        if not FAST_PATH:
+            response = http_client.get(url, timeout=10)
+            response.raise_for_status()
+            return extract_images(response.content, url)
         
-        # En fazla 10 görsel döndür
-        return unique_images[:10]
+        response = http_client.get_until(url, CX_STATE_COMPLETE_PATTERNS, timeout=10)
+        response.raise_for_status()
+        if response.truncated:
+            with metrics.timer('extract_fast'):
+                images = extract_images_fast(response.content, url)
+            if images:
+                return images
+            # cx-state'te görsel yok: tam çıkarıcı için gövdenin tamamı gerekir
+            response = http_client.get(url, timeout=10)
+            response.raise_for_status()
+        return extract_images(response.content, url)
         
     except Exception as e:
         print(f"  Hata: {str(e)}")
-        return []
+        return None
+
+# Host başına eşzamanlı istek sınırı için semaphore'lar
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+def get_host_semaphore(url):
+    """URL'nin host'u için paylaşılan semaphore'u döndürür"""
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+        return _host_semaphores[host]
+
+def fetch_images_limited(url):
+    """Host başına eşzamanlılık sınırına uyarak görselleri çeker
+    
+    İstek hızı http_client içindeki host başına uyarlanabilir limiter ile ayarlanır.
+    """
+    with get_host_semaphore(url):
+        return get_images_from_url(url)
+
+def fetch_images_sequentially(items):
+    """(index, url) çiftlerini sırayla işler"""
+    for index, url in items:
+        images = get_images_from_url(url)
+        yield index, url, images
+
+def fetch_images_concurrently(items, max_workers=MAX_WORKERS):
+    """(index, url) çiftlerini paralel işler, tamamlandıkça (index, url, images) döndürür
+
+    Kuyruğun tamamı bir kerede verilmez, en fazla max_workers * 4 istek uçuşta
+    tutulur; üretici kapatılınca (ör. Ctrl+C) kuyrukta bekleyen istekler iptal edilir.
+    """
+    items = iter(items)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    in_flight = {}
+
+    def submit_next():
+        for index, url in items:
+            in_flight[executor.submit(fetch_images_limited, url)] = (index, url)
+            return True
+        return False
+
+    try:
+        for _ in range(max_workers * 4):
+            if not submit_next():
+                break
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index, url = in_flight.pop(future)
+                try:
+                    images = future.result()
+                except Exception as e:
+                    print(f"  Hata: {str(e)}")
+                    images = None
+                submit_next()
+                yield index, url, images
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def apply_images(df, index, images, stats, verbose=True):
+    """Bulunan görselleri ilgili satırın 'Ana görsel' / 'Diğer görseller' hücrelerine yazar"""
+    if not verbose:
+        if images:
+            df.at[index, 'Ana görsel'] = images[0]
+            if len(images) > 1:
+                df.at[index, 'Diğer görseller'] = ', '.join(images[1:])
+        return
+    
+    if not images:
+        print(f"  ⚠️  Görsel bulunamadı!")
+        stats['no_images'] += 1
+        # Hücreyi boş bırak (zaten boş)
+        return
+    
+    print(f"  ✅ {len(images)} görsel bulundu")
+    
+    # İlk görseli "Ana görsel" sütununa yaz
+    df.at[index, 'Ana görsel'] = images[0]
+    print(f"    ✓ Ana görsel: {images[0][:80]}...")
+    
+    # Diğer görselleri "Diğer görseller" sütununa virgülle ayırarak yaz
+    if len(images) > 1:
+        other_images = images[1:]
+        df.at[index, 'Diğer görseller'] = ', '.join(other_images)
+        print(f"    ✓ {len(other_images)} diğer görsel eklendi")
+    
+    stats['success'] += 1
+
+def save_workbook(store, df):
+    """Veri setini depoya tek seferde yazar"""
+    print("\nVeri deposu güncelleniyor...")
+    with metrics.timer('save'):
+        store.save(df)
+    print(f"✅ Veri deposu güncellendi: {store.data_path}")
 
 def main():
-    print("Excel dosyası okunuyor...")
-    df = pd.read_excel(EXCEL_FILE)
+    # --export: hiç istek atmadan günlüğü veri setine uygula, kaydet ve xlsx'e aktar
+    export_only = '--export' in sys.argv[1:]
+    
+    print("Veri deposu okunuyor...")
+    store = DatasetStore(DATASET, EXCEL_FILE)
+    df = store.load()
     
     # Product URL sütununu kontrol et
     url_column = 'Product URL'
@@ -366,7 +568,29 @@ def main():
     total_products = len(df_with_urls)
     
     print(f"Toplam {total_products} ürün bulundu.")
-    print(f"Görsel linkleri Excel'e yazılacak.\n")
+    
+    # Günlükteki tamamlanmış satırları DataFrame'e uygula, bunlar tekrar çekilmez
+    journal = ProgressJournal(JOURNAL_FILE)
+    finished = {url: record for url, record in journal.load().items() if record.get('status') == 'done'}
+    pending = []
+    replayed = 0
+    for index, row in df_with_urls.iterrows():
+        url = row[url_column]
+        if url in finished:
+            apply_images(df, index, finished[url].get('images', []), None, verbose=False)
+            replayed += 1
+        else:
+            pending.append((index, url))
+    
+    if replayed:
+        print(f"📒 {replayed} ürün günlükten yüklendi ({JOURNAL_FILE}), tekrar çekilmeyecek.")
+    
+    if export_only:
+        save_workbook(store, df)
+        print(f"✅ Excel dosyası yazıldı: {store.export_xlsx()}")
+        return
+    
+    print(f"Görsel linkleri veri setine yazılacak ({len(pending)} ürün kaldı).\n")
     
     # İlerleme için stats
     stats = {
@@ -374,55 +598,37 @@ def main():
         'no_images': 0
     }
     
-    # Her kaç üründe bir Excel'i kaydet (ilerlemeyi korumak için)
-    SAVE_INTERVAL = 10
+    if MAX_WORKERS > 1:
+        # Paralel mod: istekler eşzamanlı gider, sonuçlar ana thread'de DataFrame'e yazılır
+        print(f"⚡ Paralel mod: {MAX_WORKERS} worker, host başına en fazla {PER_HOST_LIMIT} istek\n")
+        results = fetch_images_concurrently(pending)
+    else:
+        results = fetch_images_sequentially(pending)
     
-    for idx, (index, row) in enumerate(df_with_urls.iterrows(), 1):
-        product_id = row.get('Product ID', f'product_{index}')
-        product_name = row.get('Product Name', 'Unknown')
-        url = row[url_column]
-        
-        print(f"[{idx}/{total_products}] Product ID: {product_id}")
-        print(f"  Ürün: {product_name[:50]}...")
-        print(f"  URL: {url}")
-        
-        # Görselleri çek
-        images = get_images_from_url(url)
-        
-        if not images:
-            print(f"  ⚠️  Görsel bulunamadı!")
-            stats['no_images'] += 1
-            # Excel'de boş bırak (zaten boş)
-        else:
-            print(f"  ✅ {len(images)} görsel bulundu")
-            
-            # İlk görseli "Ana görsel" sütununa yaz
-            if len(images) > 0:
-                df.at[index, 'Ana görsel'] = images[0]
-                print(f"    ✓ Ana görsel: {images[0][:80]}...")
-            
-            # Diğer görselleri "Diğer görseller" sütununa virgülle ayırarak yaz
-            if len(images) > 1:
-                other_images = images[1:]
-                df.at[index, 'Diğer görseller'] = ', '.join(other_images)
-                print(f"    ✓ {len(other_images)} diğer görsel eklendi")
+    metrics.start_run(METRICS_FILE, len(pending), extra=http_client.get_metrics)
+    try:
+        for idx, (index, url, images) in enumerate(results, 1):
+            metrics.set_done(idx)
+            product_id = df.at[index, 'Product ID'] if 'Product ID' in df.columns else f'product_{index}'
+            print(f"[{idx}/{len(pending)}] Product ID: {product_id} ({metrics.format_eta()})")
+            print(f"  URL: {url}")
+            apply_images(df, index, images, stats)
             
-            stats['success'] += 1
-        
-        # Her SAVE_INTERVAL üründe bir veya son ürün ise Excel'i kaydet
-        if idx % SAVE_INTERVAL == 0 or idx == total_products:
-            print(f"\n💾 İlerleme kaydediliyor... ({idx}/{total_products})")
-            df.to_excel(EXCEL_FILE, index=False)
-            print(f"✅ Excel dosyası güncellendi: {EXCEL_FILE}\n")
-        
-        # Rate limiting için bekle
-        time.sleep(DELAY)
-        print()
+            # Sonucu hemen günlüğe yaz (başarısız istekler sonraki çalıştırmada tekrar denenir)
+            journal.append({
+                'url': url,
+                'product_id': str(product_id),
+                'status': 'failed' if images is None else 'done',
+                'images': images or []
+            })
+            print()
+    except KeyboardInterrupt:
+        print("\n⚠️  Durduruldu, şu ana kadarki sonuçlar kaydediliyor...")
+        results.close()  # Kuyrukta bekleyen istekler iptal edilir
     
-    # Son bir kez daha kaydet (güvence için)
-    print("\nExcel dosyası güncelleniyor...")
-    df.to_excel(EXCEL_FILE, index=False)
-    print(f"✅ Excel dosyası güncellendi: {EXCEL_FILE}")
+    # Veri seti sadece bir kez, en sonda yazılır
+    save_workbook(store, df)
+    metrics.finish_run()
     
     # Özet
     print("\n" + "="*60)
@@ -430,8 +636,11 @@ def main():
     print("="*60)
     print(f"Başarılı: {stats['success']}")
     print(f"Görsel bulunamayan: {stats['no_images']}")
+    print(f"Günlükten yüklenen: {replayed}")
     print(f"Toplam: {total_products}")
+    print(f"HTTP: {http_client.format_metrics()}")
+    print(f"Metrikler: {METRICS_FILE}")
+    print(f"xlsx için: python scrape_images.py --export")
 
 if __name__ == '__main__':
     main()
-
@@ -5,91 +5,156 @@ TechnoMarket.bg grid sayfasından ürün linklerini çeken script
 """
 
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import re
-import time
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Ortak modüller (common/) depo kökünde
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import html_parser, http_client
+from common.dataset_store import DatasetStore
+from scrape_technomarket import bgn_price_from_parts
 
 BASE_URL = 'https://www.technomarket.bg'
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
-EXCEL_FILE = 'Product_URLs.xlsx'
-DELAY = 1  # Her istek arasında bekleme süresi
+EXCEL_FILE = 'Product_URLs.xlsx'  # Sadece ilk içe aktarma / export_xlsx.py için
+DATASET = 'technomarket_urls'  # Veri deposundaki adı
+# Grid'den alınan bilgiler: scrape_from_urls ucuz ürünleri sayfasını hiç çekmeden atlar
+# (Lastmod sitemap_discovery.py tarafından doldurulur)
+COLUMNS = ['Product URL', 'Product Name', 'Brand', 'Price', 'Lastmod']
+PAGE_WORKERS = 8  # Eşzamanlı çekilen grid sayfası (host limiter yine geçerli)
+MAX_PAGES = 100  # Sayfa sayısı okunamazsa sırayla denenecek en fazla sayfa
 
-def extract_product_urls(page_url):
-    """Sayfadan ürün linklerini çıkarır - tm-product-item yapısından"""
+PAGE_NUMBER_PATTERN = re.compile(r'[?&]page=(\d+)')
+# Ürün sayfası yolu: /kategori/urun-adi-<8 haneli ürün kodu> (ör. /televizor/neo-led-32h3m-hd-led-tv-09218598)
+PRODUCT_PATH_PATTERN = re.compile(r'^/[^/]+/[^/]+-\d{8}/?$')
+
+def is_product_url(url):
+    """Ürün sayfası mı: kategori (/produkti/), PDF, mağaza / blog / statik sayfalar değil"""
+    path = urlparse(url).path
+    return '/produkti/' not in path and not path.lower().endswith('.pdf') and bool(PRODUCT_PATH_PATTERN.match(path))
+
+def normalize_product_link(href):
+    """Grid'deki linki tam URL'ye çevirir; ürün sayfası değilse None döndürür"""
+    if not href:
+        return None
+    
+    # URL'yi normalize et
+    if href.startswith('/'):
+        full_url = urljoin(BASE_URL, href)
+    elif href.startswith('http') and 'technomarket.bg' in href:
+        full_url = href
+    else:
+        return None
+    
+    # PDF linklerini at
+    if '.pdf' in full_url.lower():
+        return None
+    
+    # Ürün sayfası linklerini filtrele (kategori değil)
+    # Örnek: /televizor/neo-led-32h3m-hd-led-tv-09218598
+    if not is_product_url(full_url):
+        return None
+    return full_url
+
+def listing_info(item, full_url):
+    """parse_grid kartındaki ad / marka / fiyat (grid'de olanlar)"""
+    return {
+        'Product URL': full_url,
+        'Product Name': item['title'] or None,
+        'Brand': (item['brand'] or '').strip() or None,
+        'Price': bgn_price_from_parts(item['price_primary'], item['price_secondary']) if item['price_primary'] else None,
+    }
+
+def fallback_listing(soup):
+    """tm-product-item yoksa: product-image veya title class'lı linkler (ad title linkinden)"""
+    products = {}
+    for link in soup.find_all('a', class_=['product-image', 'title']):
+        full_url = normalize_product_link(link.get('href', ''))
+        if not full_url:
+            continue
+        name = (link.get_text(strip=True) or None) if 'title' in (link.get('class') or []) else None
+        if full_url not in products:
+            products[full_url] = {'Product URL': full_url, 'Product Name': name, 'Brand': None, 'Price': None}
+        elif name and not products[full_url]['Product Name']:
+            products[full_url]['Product Name'] = name
+    return products
+
+def page_url_for(page_url, page_num):
+    """Kategori URL'sinin page_num. sayfası (format: /produkti/televizor?page=2)"""
+    if '?' in page_url:
+        # Zaten parametre var, page ekle veya güncelle
+        if 'page=' in page_url:
+            return re.sub(r'page=\d+', f'page={page_num}', page_url)
+        return f"{page_url}&page={page_num}"
+    return f"{page_url}?page={page_num}"
+
+def read_page_count(paging_links):
+    """Sayfalama linklerindeki en büyük sayfa numarası (sayfalama yoksa None)
+
+    Pencereli sayfalamada bu sayı gerçek sayfa sayısından küçük olabilir; main()
+    bu sayıdan sonraki sayfaları yeni ürün çıktığı sürece sırayla dener.
+    """
+    page_numbers = [int(match.group(1)) for href in paging_links
+                    for match in [PAGE_NUMBER_PATTERN.search(href)] if match]
+    return max(page_numbers) if page_numbers else None
+
+def fetch_grid_page(page_url):
+    """Grid sayfasını çeker: (ürün kayıtları, sayfa sayısı veya None)"""
     try:
         print(f"Sayfa çekiliyor: {page_url}")
-        response = requests.get(page_url, headers=HEADERS, timeout=10)
+        response = http_client.get(page_url, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
         
-        product_urls = []
-        seen = set()
+        # tm-product-item kartları (varsayılan: ağaç kurmayan akış modu)
+        items, paging_links = html_parser.parse_grid(response.content)
         
-        # tm-product-item elementlerini bul
-        product_items = soup.find_all('tm-product-item')
+        products = {}  # URL -> kayıt (sıra korunur, tekrarlar atılır)
+        for item in items:
+            for href in item['links']:
+                full_url = normalize_product_link(href)
+                if full_url and full_url not in products:
+                    products[full_url] = listing_info(item, full_url)
         
-        if not product_items:
-            # Alternatif: direkt product-image veya title class'lı linkleri bul
-            product_items = soup.find_all('a', class_=['product-image', 'title'])
+        if not items:
+            # Alternatif yapı için ağaç gerekir
+            products = fallback_listing(html_parser.make_soup(response.content, 'grid'))
         
-        for item in product_items:
-            # Eğer tm-product-item ise, içindeki linkleri bul
-            if item.name == 'tm-product-item':
-                links = item.find_all('a', href=True)
-            else:
-                links = [item] if item.get('href') else []
-            
-            for link in links:
-                href = link.get('href', '')
-                if not href:
-                    continue
-                
-                # URL'yi normalize et
-                if href.startswith('/'):
-                    full_url = urljoin(BASE_URL, href)
-                elif href.startswith('http') and 'technomarket.bg' in href:
-                    full_url = href
-                else:
-                    continue
-                
-                # PDF linklerini at
-                if '.pdf' in full_url.lower():
-                    continue
-                
-                # Ürün sayfası linklerini filtrele (kategori değil)
-                # Örnek: /televizor/neo-led-32h3m-hd-led-tv-09218598
-                if '/produkti/' not in full_url and full_url not in seen:
-                    seen.add(full_url)
-                    product_urls.append(full_url)
-        
-        # Tekrarları temizle ve sırala
-        unique_urls = list(dict.fromkeys(product_urls))  # Sırayı koruyarak tekrarları kaldır
-        
-        print(f"  ✅ {len(unique_urls)} ürün linki bulundu")
-        return unique_urls
+        print(f"  ✅ {len(products)} ürün linki bulundu")
+        return list(products.values()), read_page_count(paging_links)
     
     except Exception as e:
         print(f"  ✗ Hata: {str(e)}")
-        return []
+        return [], None
+
+def extract_grid_products(page_url):
+    """Sayfadan ürünleri (link + grid'deki ad / marka / fiyat) çıkarır - tm-product-item yapısından"""
+    return fetch_grid_page(page_url)[0]
+
+def extract_product_urls(page_url):
+    """Sayfadan ürün linklerini çıkarır"""
+    return [product['Product URL'] for product in extract_grid_products(page_url)]
 
 def main():
     print("TechnoMarket.bg Ürün Link Çekici")
     print("="*60)
     
-    # Mevcut Excel dosyasını oku (varsa)
+    # Mevcut veri setini oku (varsa)
+    store = DatasetStore(DATASET, EXCEL_FILE)
     existing_urls = []
+    all_products = {}  # URL -> grid kaydı (sıra korunur)
     try:
-        if os.path.exists(EXCEL_FILE):
-            print(f"\n📂 Mevcut Excel dosyası bulundu: {EXCEL_FILE}")
-            existing_df = pd.read_excel(EXCEL_FILE)
+        if store.exists() or os.path.exists(EXCEL_FILE):
+            print(f"\n📂 Mevcut veri seti bulundu: {DATASET}")
+            existing_df = store.load()
             if 'Product URL' in existing_df.columns:
-                existing_urls = existing_df['Product URL'].dropna().astype(str).tolist()
-                existing_urls = [url.strip() for url in existing_urls if url.strip()]
+                for record in existing_df.reindex(columns=COLUMNS).to_dict('records'):
+                    url = str(record['Product URL']).strip() if pd.notna(record['Product URL']) else ''
+                    if url:
+                        record['Product URL'] = url
+                        all_products[url] = {k: (None if pd.isna(v) else v) for k, v in record.items()}
+                existing_urls = list(all_products)
                 print(f"  ✅ {len(existing_urls)} mevcut ürün linki yüklendi")
             else:
                 print("  ⚠️  'Product URL' sütunu bulunamadı, yeni dosya oluşturulacak")
@@ -118,58 +183,59 @@ def main():
     print(f"\n✅ {len(page_urls)} kategori URL'si alındı")
     print("-" * 60)
     
-    # Ürün linklerini çek (mevcut URL'leri de dahil et)
-    all_urls = list(existing_urls)  # Mevcut URL'leri başlangıç listesine ekle
+    def add_products(products):
+        """Grid kayıtlarını ekler / günceller; daha önce görülmemiş URL sayısını döndürür"""
+        new_count = 0
+        for product in products:
+            if product['Product URL'] not in all_products:
+                new_count += 1
+            # Grid'de olmayan alanlar (Lastmod) korunur
+            all_products.setdefault(product['Product URL'], {}).update(product)
+        return new_count
     
-    # Her kategori URL'si için işlem yap
-    for cat_idx, page_url in enumerate(page_urls, 1):
-        print(f"\n[{cat_idx}/{len(page_urls)}] İşlenen kategori: {page_url}")
-        print("-" * 60)
-        
-        # İlk sayfadan ürünleri çek
-        urls = extract_product_urls(page_url)
-        all_urls.extend(urls)
-        
-        # Sayfalama varsa diğer sayfaları da çek
-        print("Sayfalama kontrol ediliyor...")
-        page_num = 2
-        max_pages = 100  # Maksimum sayfa sayısı
-        
-        while page_num <= max_pages:
-            # Sayfa URL'sini oluştur (technomarket.bg formatına göre)
-            # URL formatı: /produkti/televizor?page=2
-            if '?' in page_url:
-                # Zaten parametre var, page ekle veya güncelle
-                if 'page=' in page_url:
-                    next_page_url = re.sub(r'page=\d+', f'page={page_num}', page_url)
-                else:
-                    next_page_url = f"{page_url}&page={page_num}"
-            else:
-                next_page_url = f"{page_url}?page={page_num}"
-            
-            time.sleep(DELAY)
-            urls = extract_product_urls(next_page_url)
-            
-            if not urls:
+    def crawl_sequentially(page_url, start=2):
+        """start. sayfadan itibaren yeni ürün çıkmayana kadar sırayla sayfa çeker"""
+        for page_num in range(start, MAX_PAGES + 1):
+            products = extract_grid_products(page_url_for(page_url, page_num))
+            if not products:
                 print(f"  Sayfa {page_num}'de ürün bulunamadı, sayfalama sona erdi.")
                 break
-            
-            # Önceki sayfalarda olan URL'ler varsa durdur
-            new_urls = [u for u in urls if u not in all_urls]
-            if not new_urls:
+            if not add_products(products):
                 print(f"  Sayfa {page_num}'de yeni ürün yok, sayfalama sona erdi.")
                 break
-            
-            all_urls.extend(new_urls)
-            print(f"  Toplam {len(all_urls)} ürün linki toplandı")
-            
-            page_num += 1
+    
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        # 1) Tüm kategorilerin ilk sayfaları: ürünler + sayfa sayısı
+        first_pages = list(executor.map(fetch_grid_page, page_urls))
         
-        print(f"✅ Kategori {cat_idx} tamamlandı. Toplam {len(all_urls)} ürün linki")
-        time.sleep(DELAY)  # Kategoriler arası bekleme
+        # 2) Kalan sayfalar tüm kategoriler için birlikte, eşzamanlı çekilir
+        remaining = []  # Kategori / sayfa sırasıyla sayfa URL'leri
+        for cat_idx, (page_url, (products, page_count)) in enumerate(zip(page_urls, first_pages), 1):
+            add_products(products)
+            if page_count:
+                print(f"[{cat_idx}/{len(page_urls)}] {page_url}: {page_count} sayfa")
+                remaining.extend(page_url_for(page_url, page_num) for page_num in range(2, page_count + 1))
+            elif products:
+                print(f"[{cat_idx}/{len(page_urls)}] {page_url}: sayfa sayısı okunamadı, sırayla taranacak")
+        
+        if remaining:
+            print(f"\n{len(remaining)} sayfa eşzamanlı çekiliyor ({PAGE_WORKERS} işçi)...")
+            print("-" * 60)
+        # map sonuçları sırayla döndürür: eşzamanlılık veri setindeki sırayı değiştirmez
+        for products, _ in executor.map(fetch_grid_page, remaining):
+            add_products(products)
+    
+    for page_url, (products, page_count) in zip(page_urls, first_pages):
+        if products and not page_count:
+            crawl_sequentially(page_url)
+        elif page_count:
+            # Sayfalama pencereli olabilir (1 … 5, sonraki): son sayfa linki görünmüyorsa
+            # sayfa sayısı eksik okunur. Yeni ürün çıktığı sürece sonraki sayfalar denenir.
+            crawl_sequentially(page_url, page_count + 1)
+    
+    print(f"✅ {len(page_urls)} kategori tamamlandı. Toplam {len(all_products)} ürün linki")
     
-    # Tekrarları temizle
-    final_urls = list(dict.fromkeys(all_urls))
+    final_urls = list(all_products)
     
     # Yeni eklenen URL sayısını hesapla
     new_urls_count = len(final_urls) - len(existing_urls)
@@ -178,13 +244,11 @@ def main():
     if existing_urls:
         print(f"   ({len(existing_urls)} mevcut + {new_urls_count} yeni)")
     
-    # Excel'e kaydet
-    print("\n💾 Excel dosyasına kaydediliyor...")
-    df = pd.DataFrame({
-        'Product URL': final_urls
-    })
-    df.to_excel(EXCEL_FILE, index=False)
-    print(f"✅ Ürün linkleri '{EXCEL_FILE}' dosyasına kaydedildi")
+    # Veri setine kaydet
+    print("\n💾 Veri setine kaydediliyor...")
+    df = pd.DataFrame(list(all_products.values()), columns=COLUMNS)
+    store.save(df)
+    print(f"✅ Ürün linkleri kaydedildi: {store.data_path}")
     if new_urls_count > 0:
         print(f"   (+{new_urls_count} yeni link eklendi)")
     
@@ -194,10 +258,11 @@ def main():
     print("="*60)
     print(f"İşlenen kategori sayısı: {len(page_urls)}")
     print(f"Toplam ürün sayısı: {len(final_urls)}")
+    print(f"HTTP: {http_client.format_metrics()}")
     if existing_urls:
         print(f"  - Mevcut: {len(existing_urls)}")
         print(f"  - Yeni eklenen: {new_urls_count}")
-    print(f"Excel dosyası: {EXCEL_FILE}")
+    print(f"Veri seti: {store.data_path} (xlsx için: python export_xlsx.py {DATASET})")
     
     # İlk 5 linki göster
     if final_urls:
@@ -4,21 +4,22 @@
 TechnoMarket.bg sitesindeki kategorileri listeleyen script
 """
 
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
+import os
+import sys
+
+# Ortak modüller (common/) depo kökünde
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import html_parser, http_client
 
 BASE_URL = 'https://www.technomarket.bg'
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
 
 def get_categories():
     """Ana sayfadan kategorileri çıkarır"""
     try:
-        response = requests.get(BASE_URL, headers=HEADERS, timeout=10)
+        response = http_client.get(BASE_URL, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = html_parser.make_soup(response.content)
         
         categories = []
         
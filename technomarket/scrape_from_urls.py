@@ -7,25 +7,162 @@ Product_URLs.xlsx dosyasındaki linklerden ürün bilgilerini çeken script
 import pandas as pd
 import sys
 import os
+import multiprocessing
+import signal
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 
 # scrape_technomarket.py'deki fonksiyonları import et
 from scrape_technomarket import (
-    get_product_details,
-    translate_text,
-    BASE_URL,
-    DELAY,
-    HEADERS
+    parse_product_details_timed,
+    PRODUCT_PAGE_COMPLETE_PATTERNS,
+    submit_translation,
+    SegmentedTranslation,
+    CATEGORY_SEPARATOR,
+    DESCRIPTION_SEPARATOR,
+    BASE_URL
 )
-import time
+from common import http_client, metrics
+from common.dataset_store import DatasetStore
+from common.ledger import ScrapeLedger, DONE, FAILED, PENDING, SKIPPED_CHEAP
+from common.row_buffer import RowBuffer
+from common.translation_memory import get_default_memory
+from common.translation_worker import get_default_worker
 
 # Ayarlar
 PRODUCT_URLS_FILE = 'Product_URLs.xlsx'
 OUTPUT_FILE = 'TechnoMarket_Urunler.xlsx'
+URLS_DATASET = 'technomarket_urls'  # Veri deposundaki adlar (xlsx sadece export_xlsx.py ile üretilir)
+OUTPUT_DATASET = 'technomarket'
 MAX_PRODUCTS = 20  # İlk kaç ürün işlenecek
-SAVE_INTERVAL = 10  # Her kaç üründe bir Excel kaydedilsin
+LEDGER_FILE = 'scrape_ledger.sqlite'  # URL başına durum / deneme sayısı (kaldığı yerden devam için)
+MIN_PRICE = 100  # Bu fiyatın (BGN) altındaki ürünler atlanır
+SAVE_INTERVAL = 10  # Her kaç üründe bir veri seti kaydedilsin
+METRICS_FILE = 'scrape_metrics.prom'  # Aşama süreleri, hız ve ETA (düzenli olarak yazılır)
+FETCH_WORKERS = 8  # Eşzamanlı sayfa isteği (host başına hız yine limiter'a bağlı)
+PARSE_WORKERS = os.cpu_count() or 1  # HTML parse eden süreç sayısı
+PARSE_START_METHOD = 'spawn'  # fork, çalışan thread'lerin (HTTP havuzu, çeviri işçisi) kilitlerini kopyalar
+FETCH_TIMEOUT = 3  # Ürün sayfası isteği zaman aşımı (saniye)
+MAX_IN_FLIGHT = 32  # Çekilen + parse edilen + çevirisi süren en fazla ürün sayısı
 
-def create_excel_template():
-    """Excel şablonunu oluşturur"""
+def read_listings(urls_df):
+    """Product_URLs.xlsx'teki listeleme bilgisi: URL -> (parmak izi, grid fiyatı)
+
+    Parmak izi sitemap lastmod'u, o yoksa grid'deki ürün adıdır; ikisi de yoksa None.
+    Fiyat parmak izine girmez: sadece fiyatı değişen ürünün sayfası tekrar çekilmez.
+    """
+    listings = {}
+    for record in urls_df.reindex(columns=['Product URL', 'Product Name', 'Price', 'Lastmod']).to_dict('records'):
+        url = str(record['Product URL']).strip() if pd.notna(record['Product URL']) else ''
+        if not url:
+            continue
+        if pd.notna(record['Lastmod']):
+            fingerprint = f"lastmod:{record['Lastmod']}"
+        elif pd.notna(record['Product Name']):
+            fingerprint = f"name:{record['Product Name']}"
+        else:
+            fingerprint = None
+        price = float(record['Price']) if pd.notna(record['Price']) else None
+        listings[url] = (fingerprint, price)
+    return listings
+
+def fetch_product_page(product_url):
+    """Çekme aşaması: ürün sayfasının ham içeriğini döndürür (gereken alanlar görülünce okuma kesilir)"""
+    response = http_client.get_until(product_url, PRODUCT_PAGE_COMPLETE_PATTERNS, timeout=FETCH_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+def ignore_interrupt():
+    """Parse süreçleri Ctrl+C'yi yok sayar; kesmeyi ana süreç yönetir"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def parse_inline(content, product_url):
+    """Süreç havuzu yokken parse'ı ana thread'de yapar (sonucu tamamlanmış Future olarak döner)"""
+    future = Future()
+    try:
+        future.set_result(parse_product_details_timed(content, product_url))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def preview(text, limit=100):
+    return text[:limit] + '...' if len(text) > limit else text
+
+class PendingProduct:
+    """Çekilmiş, çevirileri arka planda süren ürün"""
+    
+    def __init__(self, product_url, product_data):
+        self.product_url = product_url
+        self.product_data = product_data
+        self.brand = (product_data.get('brand') or '').strip()
+        self.product_name = (product_data.get('product_name') or '').strip()
+        self.category = (product_data.get('category') or '').strip()
+        self.description = (product_data.get('description') or '').strip()
+        self.name_future = submit_translation(self.product_name)
+        self.category_translation = SegmentedTranslation(self.category, CATEGORY_SEPARATOR)
+        # Açıklama satır satır çevrilir (tekrar eden özellik satırları bellekten gelir)
+        self.description_translation = SegmentedTranslation(self.description, DESCRIPTION_SEPARATOR)
+    
+    def futures(self):
+        return [self.name_future] + self.category_translation.futures + self.description_translation.futures
+    
+    def done(self):
+        return all(future.done() for future in self.futures())
+    
+    def build_row(self):
+        """Çevirileri bekleyip Excel satırını oluşturur"""
+        print(f"\n  Ürün: {self.product_url}")
+        
+        # Ürün adını işle: Marka + çevrilmiş ürün adı
+        translated_name = self.name_future.result() if self.product_name else ''
+        if self.product_name:
+            print(f"    Ürün Adı Çevirisi:")
+            print(f"      Orijinal: {self.product_name}")
+            print(f"      Çevrilmiş: {translated_name}")
+        
+        # Markayı başa ekle
+        final_product_name = ' '.join(part for part in (self.brand, translated_name) if part)
+        
+        # Kategori çevirisi
+        translated_category = self.category_translation.result() if self.category else ''
+        if self.category:
+            print(f"    Kategori Çevirisi:")
+            print(f"      Orijinal: {self.category}")
+            print(f"      Çevrilmiş: {translated_category}")
+        
+        # Açıklama çevirisi (hata olursa orijinal metin döner)
+        translated_description = self.description_translation.result() if self.description else ''
+        if self.description:
+            print(f"    Açıklama Çevirisi:")
+            print(f"      Orijinal: {preview(self.description)}")
+            print(f"      Çevrilmiş: {preview(translated_description)}")
+        
+        # Görselleri dağıt: İlk görsel Ana görsel, sonraki 5 görsel Image 1-5
+        images = self.product_data.get('images', [])
+        
+        return {
+            'Product ID': self.product_data.get('product_id', ''),
+            'Barkod (EAN Number)': self.product_data.get('ean', ''),
+            'Product Name': final_product_name,
+            'Price': self.product_data.get('price'),
+            'Currency': 'BGN',
+            'Category': translated_category,
+            'Brand': self.brand,  # Marka çevrilmez, olduğu gibi alınır
+            'Açıklama': translated_description,
+            'Product URL': self.product_url,
+            'Ana görsel': images[0] if len(images) > 0 else '',
+            'Image 1': images[1] if len(images) > 1 else '',
+            'Image 2': images[2] if len(images) > 2 else '',
+            'Image 3': images[3] if len(images) > 3 else '',
+            'Image 4': images[4] if len(images) > 4 else '',
+            'Image 5': images[5] if len(images) > 5 else '',
+            'Diğer görseller': ''  # Boş bırakılıyor
+        }
+
+def create_excel_template(store):
+    """Boş veri setini (şablon sütunlarıyla) depoya yazar ve döndürür"""
     columns = [
         'Product ID',
         'Barkod (EAN Number)',
@@ -46,21 +183,23 @@ def create_excel_template():
     ]
     
     df = pd.DataFrame(columns=columns)
-    df.to_excel(OUTPUT_FILE, index=False)
-    print(f"✅ Excel şablonu oluşturuldu: {OUTPUT_FILE}")
+    store.save(df)
+    print(f"✅ Veri seti şablonu oluşturuldu: {store.data_path}")
+    return df
 
 def main():
     print("TechnoMarket.bg Ürün Detay Çekici")
     print("="*60)
     
-    # Product_URLs.xlsx dosyasını kontrol et
-    if not os.path.exists(PRODUCT_URLS_FILE):
+    # Ürün linkleri veri setini kontrol et (depo yoksa Product_URLs.xlsx içe aktarılır)
+    urls_store = DatasetStore(URLS_DATASET, PRODUCT_URLS_FILE)
+    if not urls_store.exists() and not os.path.exists(PRODUCT_URLS_FILE):
         print(f"❌ Hata: '{PRODUCT_URLS_FILE}' dosyası bulunamadı!")
         return
     
-    print(f"\n📂 '{PRODUCT_URLS_FILE}' dosyası okunuyor...")
+    print(f"\n📂 Ürün linkleri okunuyor...")
     try:
-        urls_df = pd.read_excel(PRODUCT_URLS_FILE)
+        urls_df = urls_store.load()
         
         if 'Product URL' not in urls_df.columns:
             print(f"❌ Hata: 'Product URL' sütunu bulunamadı!")
@@ -73,172 +212,263 @@ def main():
         
         print(f"✅ {total_products} ürün linki bulundu")
         
-        # 3690. ürün dan devam et
-        START_FROM = 3690
-        if START_FROM > 1 and total_products >= START_FROM:
-            product_urls = all_product_urls[START_FROM - 1:]  # 0-indexed olduğu için -1
-            print(f"🔄 {START_FROM}. ürün dan devam ediliyor...")
-            print(f"📝 Kalan {len(product_urls)} ürün işlenecek")
-        else:
-            product_urls = all_product_urls
-            START_FROM = 1
-            print(f"📝 Tüm {len(product_urls)} ürün işlenecek")
-        
     except Exception as e:
         print(f"❌ Dosya okuma hatası: {str(e)}")
         return
     
-    # Excel şablonunu oluştur veya mevcut dosyayı oku
+    # Veri seti şablonunu oluştur veya mevcut veri setini oku
+    store = DatasetStore(OUTPUT_DATASET, OUTPUT_FILE)
     try:
-        if os.path.exists(OUTPUT_FILE):
-            print(f"\n📂 Mevcut Excel dosyası bulundu: {OUTPUT_FILE}")
-            df = pd.read_excel(OUTPUT_FILE)
-            print(f"  ✅ {len(df)} mevcut ürün yüklendi")
+        if store.exists() or os.path.exists(OUTPUT_FILE):
+            df = store.load()
+            print(f"\n📂 Mevcut veri seti yüklendi: {len(df)} ürün")
         else:
-            create_excel_template()
-            df = pd.read_excel(OUTPUT_FILE)
+            df = create_excel_template(store)
     except Exception as e:
-        print(f"⚠️  Excel dosyası okunamadı, yeni oluşturuluyor: {str(e)}")
-        create_excel_template()
-        df = pd.read_excel(OUTPUT_FILE)
+        print(f"⚠️  Veri seti okunamadı, yeni oluşturuluyor: {str(e)}")
+        df = create_excel_template(store)
+    
+    # Satırlar sütun listelerinde biriktirilir, DataFrame sadece kayıt anında oluşturulur
+    rows = RowBuffer.from_frame(df)
+    
+    # Defter: veri setinde satırı olan URL'ler done, yeni URL'ler pending; sadece kalanlar işlenir
+    ledger = ScrapeLedger(LEDGER_FILE)
+    ledger.add(all_product_urls)
+    ledger.reconcile(url for url in df['Product URL'].dropna().astype(str) if url.strip())
+    
+    # Grid'de fiyatı MIN_PRICE altında görünen ürünlerin sayfası hiç çekilmez
+    # (fiyatı sonradan eşiği geçenler tekrar kuyruğa girer)
+    listings = read_listings(urls_df)
+    listing_prices = {url: price for url, (_, price) in listings.items() if price is not None}
+    cheap_urls = [url for url, price in listing_prices.items() if price < MIN_PRICE]
+    skipped_by_listing = ledger.transition(cheap_urls, (PENDING, FAILED), SKIPPED_CHEAP)
+    # Kayıtlı ürünün grid fiyatı eşiğin altına düştüyse fiyatı güncellenmez, ürün atlanır:
+    # satırı veri setinden çıkar, listeleme bilgisi kaydedilir (fiyat eşiği geçince tekrar çekilir)
+    done_listings = ledger.fingerprints()
+    cheap_done_urls = [url for url in cheap_urls if url in done_listings]
+    ledger.transition(cheap_done_urls, (DONE,), SKIPPED_CHEAP)
+    ledger.set_fingerprints((url,) + listings[url] for url in cheap_done_urls)
+    dropped_rows = rows.remove('Product URL', cheap_done_urls)
+    # Atlananlardan grid fiyatı eşiği geçen ve listeleme bilgisi atlandığı andan farklı
+    # olanlar tekrar kuyruğa girer (sayfa fiyatı eşik altında olan ürün her çalıştırmada çekilmez)
+    ledger.transition([url for url, skipped_listing in ledger.fingerprints(SKIPPED_CHEAP).items()
+                       if listing_prices.get(url, 0) >= MIN_PRICE and skipped_listing != listings[url]],
+                      (SKIPPED_CHEAP,), PENDING)
+    if skipped_by_listing:
+        print(f"💸 {skipped_by_listing} ürün grid fiyatı {MIN_PRICE} BGN altında olduğu için çekilmeden atlandı")
+    if cheap_done_urls:
+        print(f"💸 {len(cheap_done_urls)} kayıtlı ürünün grid fiyatı {MIN_PRICE} BGN altına düştü, "
+              f"veri setinden çıkarıldı ({dropped_rows} satır)")
+    
+    # Delta tarama: kayıtlı ürünlerden parmak izi değişenler tekrar çekilir,
+    # sadece grid fiyatı değişenlerin fiyatı sayfa çekilmeden yerinde güncellenir
+    changed_urls = []
+    repriced_urls = []  # Fiyatı güncellenmiş, parmak izi henüz kaydedilmemiş URL'ler
+    for url, (old_fingerprint, old_price) in ledger.fingerprints().items():
+        fingerprint, price = listings.get(url, (None, None))
+        if fingerprint is None:
+            continue
+        if old_fingerprint is None:
+            # Parmak izi tutulmadan önce kaydedilmiş ürün: şimdiki bilgi temel alınır
+            if price is not None:
+                rows.update('Product URL', url, {'Price': price})
+            repriced_urls.append(url)
+        elif fingerprint != old_fingerprint:
+            # Parmak izi türü değişmişse de (ör. sitemap keşfinden sonra name: -> lastmod:)
+            # iki bilgi karşılaştırılamaz; ürün tamamen tekrar çekilir
+            changed_urls.append(url)
+        elif price is not None and price != old_price:
+            if rows.update('Product URL', url, {'Price': price}):
+                repriced_urls.append(url)
+    ledger.transition(changed_urls, (DONE,), PENDING)
+    if changed_urls or repriced_urls:
+        print(f"🔁 Delta: {len(changed_urls)} değişen ürün tekrar çekilecek, "
+              f"{len(repriced_urls)} ürünün fiyatı / parmak izi güncellendi")
+    product_urls = ledger.todo()
+    print(f"📒 Defter: {ledger.format_counts()}")
+    print(f"📝 {len(product_urls)} ürün işlenecek (bekleyen + tekrar denenecek)")
+    unsaved_urls = []  # Satırı eklenmiş ama henüz veri setine yazılmamış URL'ler
     
     # İstatistikler
-    stats = {'success': 0, 'failed': 0}
+    stats = {'success': 0, 'skipped': 0, 'failed': 0}
     
     # Her ürün için detayları çek
     print("\n" + "="*60)
     print("Ürün detayları çekiliyor...")
     print("="*60)
     
-    for idx, product_url in enumerate(product_urls, start=START_FROM):
-        print(f"\n[{idx}/{total_products}] Ürün işleniyor...")
-        print(f"  URL: {product_url}")
+    metrics.start_run(METRICS_FILE, len(product_urls), extra=http_client.get_metrics)
+    
+    def save_checkpoint():
+        """Veri setini yazar; ancak yazma başarılı olunca eklenen URL'ler defterde done olur"""
+        with metrics.timer('save'):
+            store.save(rows.to_frame())
+        ledger.mark(unsaved_urls, DONE)
+        ledger.set_fingerprints((url,) + listings.get(url, (None, None)) for url in unsaved_urls + repriced_urls)
+        unsaved_urls.clear()
+        repriced_urls.clear()
+    
+    def write_product(pending):
+        """Yazma aşaması: çevirisi biten ürünü satır olarak ekler (sadece ana thread)"""
+        new_row = pending.build_row()
+        rows.upsert(new_row, 'Product URL')  # Delta taramada değişen ürünün satırı yerinde güncellenir
+        unsaved_urls.append(pending.product_url)
+        stats['success'] += 1
         
-        # Ürün detaylarını çek (3 saniye timeout)
-        try:
-            product_data = get_product_details(product_url, timeout=3)
-        except Exception as e:
-            print(f"  ✗ Timeout veya hata: {str(e)}")
-            stats['failed'] += 1
-            time.sleep(DELAY)
-            continue
+        print(f"  ✓ Ürün eklendi: {new_row['Product Name'][:50] if new_row['Product Name'] else 'N/A'}...")
+        print(f"    Fiyat: {new_row['Price']} BGN" if new_row['Price'] else "    Fiyat: Bulunamadı")
+        print(f"    Görseller: {len(pending.product_data['images'])} adet")
         
+        # Her SAVE_INTERVAL üründe bir veri setini kaydet
+        if stats['success'] % SAVE_INTERVAL == 0:
+            print(f"\n💾 İlerleme kaydediliyor... ({stats['success']} ürün eklendi)")
+            save_checkpoint()
+            print(f"✅ Veri seti güncellendi: {store.data_path}\n")
+    
+    def handle_parsed(product_url, product_data):
+        """Fiyat kontrolü; geçen ürünün çevirileri arka planda başlar"""
         if not product_data:
-            print(f"  ✗ Ürün bilgileri çekilemedi")
+            print(f"  ✗ Ürün bilgileri çekilemedi: {product_url}")
+            ledger.mark(product_url, FAILED, 'no product data')
             stats['failed'] += 1
-            time.sleep(DELAY)
-            continue
+            return
         
-        # Fiyat kontrolü - 100 BGN altı ürünleri atla
+        # Fiyat kontrolü - MIN_PRICE BGN altı ürünleri atla
         price = product_data.get('price')
-        if price is None or price < 100:
-            if price is None:
-                print(f"  ⚠️  Fiyat bulunamadı, atlanıyor")
-            else:
-                print(f"  ⚠️  Fiyat {price} BGN (< 100 BGN), atlanıyor")
+        if price is None:
+            print(f"  ⚠️  Fiyat bulunamadı, atlanıyor: {product_url}")
+            ledger.mark(product_url, FAILED, 'price not found')
             stats['failed'] += 1
-            time.sleep(DELAY)
-            continue
-        
-        # Ürün adını işle: Marka + çevrilmiş ürün adı
-        brand = product_data.get('brand', '').strip()
-        product_name = product_data.get('product_name', '').strip()
-        
-        # Ürün adını çevir
-        translated_name = ''
-        if product_name:
-            print(f"    Ürün Adı Çevirisi:")
-            print(f"      Orijinal: {product_name}")
-            translated_name = translate_text(product_name)
-            print(f"      Çevrilmiş: {translated_name}")
-        
-        # Markayı başa ekle
-        if brand and translated_name:
-            final_product_name = f"{brand} {translated_name}"
-        elif brand:
-            final_product_name = brand
-        elif translated_name:
-            final_product_name = translated_name
-        else:
-            final_product_name = ''
-        
-        # Kategori çevirisi
-        category = product_data.get('category', '').strip()
-        translated_category = ''
-        if category:
-            print(f"    Kategori Çevirisi:")
-            print(f"      Orijinal: {category}")
-            translated_category = translate_text(category)
-            print(f"      Çevrilmiş: {translated_category}")
+            return
+        if price < MIN_PRICE:
+            print(f"  ⚠️  Fiyat {price} BGN (< {MIN_PRICE} BGN), atlanıyor: {product_url}")
+            ledger.mark(product_url, SKIPPED_CHEAP)
+            # Listeleme bilgisi kaydedilir: değişmedikçe ürün tekrar çekilmez
+            ledger.set_fingerprints([(product_url,) + listings.get(product_url, (None, None))])
+            stats['skipped'] += 1
+            return
         
-        # Açıklamayı çevir
-        description = product_data.get('description', '').strip()
-        translated_description = ''
-        if description:
-            print(f"    Açıklama Çevirisi:")
-            # Açıklama uzun olabilir, ilk 100 karakteri göster
-            desc_preview = description[:100] + '...' if len(description) > 100 else description
-            print(f"      Orijinal: {desc_preview}")
-            # Açıklamayı çevir (Google Translator limitine uygun şekilde)
+        in_translation.append(PendingProduct(product_url, product_data))
+    
+    # Boru hattı: çekme (thread havuzu) -> parse (süreç havuzu) -> çeviri (çeviri işçisi) -> yazma (ana thread)
+    # Aşamalar arası kuyruklar, uçuştaki toplam ürün MAX_IN_FLIGHT ile sınırlanarak sınırlı tutulur.
+    url_iter = iter(product_urls)
+    fetching = {}  # Future -> URL
+    parsing = {}  # Future -> (URL, sayfa içeriği); havuz çökerse içerik tekrar parse edilir
+    in_translation = []  # Çevirisi süren PendingProduct'lar
+    processed = 0
+    parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS,
+                                     mp_context=multiprocessing.get_context(PARSE_START_METHOD),
+                                     initializer=ignore_interrupt)
+    
+    def submit_parse(product_url, content):
+        nonlocal parse_pool
+        if parse_pool is not None:
             try:
-                translated_description = translate_text(description)
-                translated_preview = translated_description[:100] + '...' if len(translated_description) > 100 else translated_description
-                print(f"      Çevrilmiş: {translated_preview}")
-            except Exception as e:
-                print(f"      Çeviri hatası: {str(e)}")
-                translated_description = description
-        
-        # Görselleri dağıt: İlk görsel Ana görsel, sonraki 5 görsel Image 1-5
-        images = product_data.get('images', [])
-        
-        # Yeni satır oluştur
-        new_row = {
-            'Product ID': product_data.get('product_id', ''),
-            'Barkod (EAN Number)': product_data.get('ean', ''),
-            'Product Name': final_product_name,
-            'Price': product_data.get('price'),
-            'Currency': 'BGN',
-            'Category': translated_category,
-            'Brand': brand,  # Marka çevrilmez, olduğu gibi alınır
-            'Açıklama': translated_description,
-            'Product URL': product_url,
-            'Ana görsel': images[0] if len(images) > 0 else '',
-            'Image 1': images[1] if len(images) > 1 else '',
-            'Image 2': images[2] if len(images) > 2 else '',
-            'Image 3': images[3] if len(images) > 3 else '',
-            'Image 4': images[4] if len(images) > 4 else '',
-            'Image 5': images[5] if len(images) > 5 else '',
-            'Diğer görseller': ''  # Boş bırakılıyor
-        }
-        
-        df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-        stats['success'] += 1
-        
-        print(f"  ✓ Ürün eklendi: {new_row['Product Name'][:50] if new_row['Product Name'] else 'N/A'}...")
-        print(f"    Fiyat: {new_row['Price']} BGN" if new_row['Price'] else "    Fiyat: Bulunamadı")
-        print(f"    Görseller: {len(product_data['images'])} adet")
+                parsing[parse_pool.submit(parse_product_details_timed, content, product_url)] = (product_url, content)
+                return
+            except BrokenProcessPool:
+                stop_parse_pool()
+        parsing[parse_inline(content, product_url)] = (product_url, content)
+    
+    def stop_parse_pool():
+        """Çöken süreç havuzunu kapatır; kalan sayfalar ana thread'de parse edilir"""
+        nonlocal parse_pool
+        if parse_pool is not None:
+            print("\n⚠️  Parse süreç havuzu çöktü, parse ana thread'de sürdürülüyor...")
+            parse_pool.shutdown(wait=False, cancel_futures=True)
+            parse_pool = None
+    
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as fetch_pool:
         
-        # Her SAVE_INTERVAL üründe bir veya son ürün ise Excel'i kaydet
-        if idx % SAVE_INTERVAL == 0 or idx == len(product_urls):
-            print(f"\n💾 İlerleme kaydediliyor... ({idx}/{len(product_urls)} ürün işlendi, {stats['success']} başarılı)")
-            df.to_excel(OUTPUT_FILE, index=False)
-            print(f"✅ Excel dosyası güncellendi: {OUTPUT_FILE}\n")
+        def fill_fetch_queue():
+            while len(fetching) + len(parsing) + len(in_translation) < MAX_IN_FLIGHT:
+                product_url = next(url_iter, None)
+                if product_url is None:
+                    return
+                fetching[fetch_pool.submit(fetch_product_page, product_url)] = product_url
         
-        time.sleep(DELAY)
+        try:
+            fill_fetch_queue()
+            while fetching or parsing or in_translation:
+                waiting = list(fetching) + list(parsing)
+                for pending in in_translation:
+                    waiting.extend(pending.futures())
+                wait(waiting, return_when=FIRST_COMPLETED)
+                
+                for future in [f for f in fetching if f.done()]:
+                    product_url = fetching.pop(future)
+                    try:
+                        content = future.result()
+                    except Exception as e:
+                        print(f"  ✗ Timeout veya hata: {product_url}: {str(e)}")
+                        ledger.mark(product_url, FAILED, str(e))
+                        stats['failed'] += 1
+                        processed += 1
+                        metrics.set_done(processed)
+                        continue
+                    submit_parse(product_url, content)
+                
+                for future in [f for f in parsing if f.done()]:
+                    product_url, content = parsing.pop(future)
+                    parse_error = None
+                    try:
+                        product_data, timings = future.result()
+                    except BrokenProcessPool:
+                        stop_parse_pool()
+                        submit_parse(product_url, content)
+                        continue
+                    except Exception as e:
+                        product_data, timings, parse_error = None, {}, e
+                    processed += 1
+                    metrics.set_done(processed)
+                    print(f"\n[{processed}/{len(product_urls)}] {product_url} ({metrics.format_eta()})")
+                    # Alt süreçte ölçülen parse / extract süreleri burada kaydedilir
+                    for stage, seconds in timings.items():
+                        metrics.observe(stage, seconds)
+                    if parse_error is not None:
+                        print(f"  ✗ Parse hatası: {str(parse_error)}")
+                    handle_parsed(product_url, product_data)
+                
+                for pending in [p for p in in_translation if p.done()]:
+                    in_translation.remove(pending)
+                    write_product(pending)
+                
+                fill_fetch_queue()
+        except KeyboardInterrupt:
+            print("\n⚠️  Durduruldu, çevirisi süren ürünler tamamlanıp kaydediliyor...")
+            for future in list(fetching) + list(parsing):
+                future.cancel()
+            for pending in in_translation:
+                write_product(pending)
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown(cancel_futures=True)
     
     # Son kayıt
-    print("\n💾 Excel dosyası güncelleniyor...")
-    df.to_excel(OUTPUT_FILE, index=False)
-    print(f"✅ Excel dosyası güncellendi: {OUTPUT_FILE}")
+    metrics.set_done(len(product_urls))
+    print("\n💾 Veri seti güncelleniyor...")
+    save_checkpoint()
+    metrics.finish_run()
+    print(f"✅ Veri seti güncellendi: {store.data_path}")
+    print(f"   (xlsx için: python export_xlsx.py {OUTPUT_DATASET})")
     
     # Özet
     print("\n" + "="*60)
     print("ÖZET")
     print("="*60)
     print(f"Başarılı: {stats['success']}")
+    print(f"Ucuz (atlanan): {stats['skipped']}")
+    print(f"Delta: {len(changed_urls)} değişen ürün tekrar çekildi")
     print(f"Başarısız: {stats['failed']}")
     print(f"Toplam işlenen: {len(product_urls)}")
-    print(f"Toplam ürün sayısı (Excel'de): {len(df)}")
+    print(f"Defter: {ledger.format_counts()}")
+    print(f"Toplam ürün sayısı (veri setinde): {len(rows)}")
+    print(f"HTTP: {http_client.format_metrics()}")
+    print(f"Çeviri: {get_default_memory().format_stats()}")
+    if get_default_worker() is not None:
+        print(f"Çeviri istekleri: {get_default_worker().format_stats()}")
+    print(f"Metrikler: {METRICS_FILE}")
 
 if __name__ == '__main__':
     main()
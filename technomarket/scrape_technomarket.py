@@ -6,47 +6,167 @@ Bulgarca metinleri Türkçe'ye çevirir
 """
 
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import time
+from bs4 import Tag
+import soupsieve
+from concurrent.futures import Future
 from urllib.parse import urljoin, urlparse
 import json
 import re
+import os
+import sys
+import time
+
+# Ortak modüller (common/) depo kökünde
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import html_parser, http_client, metrics
+from common.dataset_store import DatasetStore
+from common.row_buffer import RowBuffer
+from common.translation_memory import get_default_memory
+from common.translation_worker import TRANSLATOR_AVAILABLE, get_default_worker
 
 # Çeviri için (deep-translator kullanılacak)
-try:
-    from deep_translator import GoogleTranslator
-    TRANSLATOR_AVAILABLE = True
-except ImportError:
-    TRANSLATOR_AVAILABLE = False
+if not TRANSLATOR_AVAILABLE:
     print("⚠️  deep-translator paketi bulunamadı. Çeviri yapılmayacak.")
     print("   Yüklemek için: pip install deep-translator")
 
 # Ayarlar
 BASE_URL = 'https://www.technomarket.bg'
 EXCEL_FILE = 'TechnoMarket_Urunler.xlsx'
-DELAY = 2  # Her istek arasında bekleme süresi (saniye)
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+DATASET = 'technomarket'  # Veri deposundaki adı (xlsx sadece export_xlsx.py ile üretilir)
+CATEGORY_SEPARATOR = ' > '  # Kategori hiyerarşisi ayıracı
+DESCRIPTION_SEPARATOR = '\n'  # Açıklama satırları ayıracı
+
+# Ürün sayfası çıkarım planı: alan -> öncelik sırasıyla seçiciler.
+# ('seçici', 'all') select() gibi tüm eşleşmeleri, düz 'seçici' select_one() gibi ilkini toplar.
+# Seçiciler import sırasında bir kez derlenir. Her alanın ilk (TechnoMarket'e özel) seçicisi
+# tek bir ağaç geçişinde çalışır; yedek seçiciler sadece gerektiğinde, hepsi birlikte
+# ikinci bir geçişte çalışır.
+EXTRACTION_SPEC = {
+    'name': ['.name', 'h1.product-title', 'h1.product-name', '.product-title', 'h1',
+             '[class*="product"][class*="name"]', '[class*="product"][class*="title"]'],
+    'price': ['.price tm-price .bgn', '.price', '.product-price', '[class*="price"]', '[data-price]'],
+    'ean': ['tm-pointandplace'],
+    'brand': ['[data-brand]', '[class*="brand"]', '.product-brand'],
+    'category': ['[data-category]', ('.breadcrumb a', 'all'), ('[class*="breadcrumb"] a', 'all'),
+                 ('[class*="category"]', 'all')],
+    'description': [('.collapsed-content .product-basic ul li', 'all'), '.product-description',
+                    '[class*="description"]', '.product-details'],
+    'images': ['.slider-content', ('.product-gallery img', 'all'), ('.product-images img', 'all'),
+               ('[class*="product"] img[src]', 'all'), ('img[data-zoom-url]', 'all'),
+               ('img[data-large-url]', 'all')],
 }
 
+# Basit seçici: tek parça tag / .class / [attr] / [attr*="değer"] (ön eleme tam eşleşmedir)
+SIMPLE_SELECTOR_PATTERN = re.compile(r'^([\w-]+)?((?:\.[\w-]+|\[[\w-]+(?:\*="[^"]*")?\])*)$')
+SELECTOR_PART_PATTERN = re.compile(r'\.([\w-]+)|\[([\w-]+)(?:\*="([^"]*)")?\]')
+
+def compile_rule(field, index, rule):
+    """Kuralı (alan, sıra, tümü mü, tag, sınıflar, attribute'lar, derlenmiş seçici) olarak derler
+    
+    Derlenmiş seçici sadece ata koşulu olan (boşluklu) seçicilerde tutulur; diğerlerinde
+    tag/sınıf/attribute kontrolü eşleşme için yeterlidir.
+    """
+    selector, mode = rule if isinstance(rule, tuple) else (rule, 'first')
+    last_part = selector.split()[-1]
+    key = SIMPLE_SELECTOR_PATTERN.match(last_part)
+    if key is None:
+        raise ValueError(f"Desteklenmeyen seçici: {selector}")
+    tag, parts = key.groups()
+    classes, attrs = [], []
+    for class_name, attr, contains in SELECTOR_PART_PATTERN.findall(parts):
+        if class_name:
+            classes.append(class_name)
+        else:
+            attrs.append((attr, contains))
+    compiled = soupsieve.compile(selector) if last_part != selector else None
+    return field, index, mode == 'all', tag, tuple(classes), tuple(attrs), compiled
+
+def compile_extraction_spec(spec):
+    """(ilk seçiciler, yedek seçiciler) kural listeleri"""
+    primary, fallback = [], []
+    for field, rules in spec.items():
+        for index, rule in enumerate(rules):
+            (fallback if index else primary).append(compile_rule(field, index, rule))
+    return primary, fallback
+
+PRIMARY_RULES, FALLBACK_RULES = compile_extraction_spec(EXTRACTION_SPEC)
+PRICE_PRIMARY_SELECTOR = soupsieve.compile('.primary')
+PRICE_SECONDARY_SELECTOR = soupsieve.compile('.secondary')
+
+# EAN / Barkod / ürün kodu etiketleri tek regex'te (alternatif sırası: uzun etiket önce)
+PRODUCT_CODE_LABELS = ('ean', 'barkod', 'product_code', 'code')
+PRODUCT_CODE_PATTERN = re.compile(
+    r'(?:(?P<ean>EAN)|(?P<barkod>Barkod)|(?P<product_code>Код на продукта)|(?P<code>Код))[:\s]*(?P<value>\d+)',
+    re.IGNORECASE
+)
+
+def class_region_pattern(class_name, end):
+    """class listesinde class_name olan etiketten end'e kadar (bytes regex, akış modu için)"""
+    return re.compile(rb'class="(?:[^"]*\s)?' + class_name + rb'(?:\s[^"]*)?"[^>]*>.*?' + end, re.DOTALL)
+
+# Akış modunda ürün sayfası bu desenlerin hepsi eşleşince kesilir. Görseller (.slider-content)
+# ve açıklama ('all' seçicisi) iç içe etiketler içerebildiğinden bölgelerin ilk kapanış
+# etiketine güvenilmez; ürün içeriğinden sonra gelen bir işarete (benzer ürünler bloğu,
+# yoksa footer / </body>) kadar okunur. Böylece metin içinde aranan EAN / ürün kodu
+# (ör. özellik tablosunda) da kesilen kısımda kalmaz.
+PRODUCT_PAGE_END_PATTERN = re.compile(rb'class="(?:[^"]*\s)?similar(?:\s[^"]*)?"|<footer\b|</body>')
+PRODUCT_PAGE_COMPLETE_PATTERNS = [
+    class_region_pattern(rb'name', rb'</'),
+    PRODUCT_PAGE_END_PATTERN,
+    re.compile(rb'<tm-price\b.*?</tm-price>', re.DOTALL),
+    re.compile(rb'<tm-pointandplace\b[^>]*>'),
+    re.compile(rb'\sdata-brand="[^"]*"'),
+    re.compile(rb'\sdata-category="[^"]*"'),
+    re.compile('Код на продукта[:\\s]*\\d+'.encode('utf-8')),
+]
+PRODUCT_URL_ID_PATTERN = re.compile(r'/p/(\d+)|/product/(\d+)|product-(\d+)|/(\d{8})$')
+LEADING_SYMBOLS_PATTERN = re.compile(r'^[^\w]*')
+
+def submit_translation(text, source='bg', target='tr'):
+    """Çeviriyi arka planda başlatır; çeviriyi (hata olursa orijinal metni) veren Future döndürür"""
+    worker = get_default_worker()
+    if worker is None or not text or pd.isna(text) or not str(text).strip():
+        future = Future()
+        future.set_result(text)
+        return future
+    return worker.submit(text, source, target)
+
 def translate_text(text, source='bg', target='tr'):
-    """Bulgarca metni Türkçe'ye çevirir"""
-    if not TRANSLATOR_AVAILABLE or not text or pd.isna(text):
-        return text
+    """Bulgarca metni Türkçe'ye çevirir (çeviri belleği + toplu çeviri işçisi üzerinden)"""
+    return submit_translation(text, source, target).result()
+
+class SegmentedTranslation:
+    """Metni ayıraçtan bölüp parçaları ayrı ayrı çeviriye gönderir ve sonra yeniden birleştirir
     
-    try:
-        text_str = str(text).strip()
-        if not text_str:
-            return text
-        
-        translator = GoogleTranslator(source=source, target=target)
-        translated = translator.translate(text_str)
-        time.sleep(0.5)  # Rate limiting
-        return translated
-    except Exception as e:
-        print(f"    Çeviri hatası: {str(e)}")
-        return text
+    Kategori yollarındaki ortak üst kategoriler ve açıklamalardaki tekrar eden özellik
+    satırları ("Wi-Fi", "Smart TV", ekran boyutları) çeviri belleğinden gelir; her
+    parça ayrı çevrildiği için uzun açıklamalar çevirici boyut sınırını aşmaz.
+    """
+    
+    def __init__(self, text, separator, source='bg', target='tr'):
+        self.separator = separator
+        if not text or pd.isna(text):
+            self.futures = [submit_translation(text, source, target)]
+        else:
+            self.futures = [submit_translation(segment.strip(), source, target)
+                            for segment in str(text).split(separator)]
+    
+    def done(self):
+        return all(future.done() for future in self.futures)
+    
+    def result(self):
+        results = [future.result() for future in self.futures]
+        if len(results) == 1:
+            return results[0]
+        return self.separator.join(results)
+
+def translate_category(category, source='bg', target='tr'):
+    """Kategori yolunu ' > ' parçaları halinde çevirir"""
+    return SegmentedTranslation(category, CATEGORY_SEPARATOR, source, target).result()
+
+def translate_description(description, source='bg', target='tr'):
+    """Açıklamayı satır satır çevirir"""
+    return SegmentedTranslation(description, DESCRIPTION_SEPARATOR, source, target).result()
 
 def extract_price(price_text):
     """Fiyat metninden sayısal değeri çıkarır (tam sayı olarak)"""
@@ -64,243 +184,270 @@ def extract_price(price_text):
     except:
         return None
 
+def parse_bgn_price(price_elem):
+    """<span class="bgn"><span class="primary">1,099</span><span class="secondary">00</span></span> -> 1099
+    
+    Ürün sayfası ve grid sayfalarındaki tm-price yapısı aynıdır.
+    """
+    primary = price_elem.select_one(PRICE_PRIMARY_SELECTOR)
+    if not primary:
+        return None
+    secondary = price_elem.select_one(PRICE_SECONDARY_SELECTOR)
+    return bgn_price_from_parts(primary.get_text(strip=True), secondary.get_text(strip=True) if secondary else None)
+
+def bgn_price_from_parts(primary_text, secondary_text=None):
+    """'1,099' + '00' -> 1099 (ağaçsız grid okuyucu metinleri doğrudan verir)"""
+    secondary_text = secondary_text or '00'
+    
+    # Binlik ayıracı (virgül) ve boşlukları temizle
+    primary_text = primary_text.replace(',', '').replace(' ', '').strip()
+    secondary_text = secondary_text.replace(',', '').replace(' ', '').strip()
+    
+    # Fiyatı birleştir (1099.00 gibi)
+    return extract_price(f"{primary_text}.{secondary_text}")
+
+def normalize_product_image_url(img_url):
+    if img_url.startswith('//'):
+        return f"https:{img_url}"
+    if img_url.startswith('/'):
+        return urljoin(BASE_URL, img_url)
+    return img_url
+
+def rule_matches(element, tag, classes, attrs, compiled):
+    if tag is not None and element.name != tag:
+        return False
+    if classes:
+        element_classes = element.get('class') or ()
+        for class_name in classes:
+            if class_name not in element_classes:
+                return False
+    for attr, contains in attrs:
+        value = element.get(attr)
+        if value is None:
+            return False
+        if contains:
+            if isinstance(value, list):
+                value = ' '.join(value)
+            if contains not in value:
+                return False
+    return compiled is None or compiled.match(element)
+
+def match_rules(soup, rules, found):
+    """Kuralları ağaç üzerinde tek geçişte çalıştırır; sonuçları found[(alan, sıra)]'ya yazar
+    
+    Doküman sırası korunur, yani sonuçlar select_one / select ile aynıdır.
+    """
+    for field, index, many, *_ in rules:
+        found[(field, index)] = [] if many else None
+    pending = list(rules)
+    for element in soup.descendants:
+        if not isinstance(element, Tag):
+            continue
+        matched_first = False
+        for field, index, many, tag, classes, attrs, compiled in pending:
+            if rule_matches(element, tag, classes, attrs, compiled):
+                if many:
+                    found[(field, index)].append(element)
+                else:
+                    found[(field, index)] = element
+                    matched_first = True
+        if matched_first:
+            # İlk eşleşmesi bulunan tekil kurallar artık denenmez
+            pending = [rule for rule in pending if rule[2] or found[(rule[0], rule[1])] is None]
+            if not pending:
+                break
+
+class PageMatches:
+    """Bir sayfa için çıkarım planı sonuçları (yedek seçiciler ilk erişimde çalışır)"""
+    
+    def __init__(self, soup):
+        self.soup = soup
+        self.found = {}
+        match_rules(soup, PRIMARY_RULES, self.found)
+    
+    def get(self, field, index=0):
+        if (field, index) not in self.found:
+            match_rules(self.soup, FALLBACK_RULES, self.found)
+        return self.found[(field, index)]
+    
+    def fallbacks(self, field):
+        """Alanın yedek seçicilerinin sonuçları (öncelik sırasıyla)"""
+        return [self.get(field, index) for index in range(1, len(EXTRACTION_SPEC[field]))]
+
+def search_product_codes(text):
+    """Doküman metninde EAN / Barkod / ürün kodlarını tek regex geçişiyle arar
+    
+    Her etiket için ilk eşleşmeyi döndürür: {'ean': ..., 'barkod': ..., 'product_code': ..., 'code': ...}
+    """
+    codes = {}
+    for match in PRODUCT_CODE_PATTERN.finditer(text):
+        label = next(name for name in PRODUCT_CODE_LABELS if match.group(name) is not None)
+        codes.setdefault(label, match.group('value'))
+        if len(codes) == len(PRODUCT_CODE_LABELS):
+            break
+    return codes
+
+def parse_product_details_timed(content, product_url):
+    """Ürün sayfası içeriğinden (bytes) detayları çıkarır: (detaylar, {aşama: süre}) döndürür
+    
+    Modül seviyesinde ve picklable olduğu için süreç havuzunda çalıştırılabilir. Alt
+    süreçte tutulan histogramlar ana sürece ulaşmadığından süreler sonuçla birlikte
+    döner; ana süreç bunları metrics.observe ile kaydeder.
+    """
+    timings = {}
+    started = time.perf_counter()
+    soup = html_parser.make_soup(content, 'product')
+    timings['parse'] = time.perf_counter() - started
+    started = time.perf_counter()
+    product_data = parse_product_soup(soup, product_url)
+    timings['extract'] = time.perf_counter() - started
+    return product_data, timings
+
+def parse_product_details(content, product_url):
+    """Ürün sayfası içeriğinden (bytes) detayları çıkarır (süreler bu süreçte kaydedilir)"""
+    product_data, timings = parse_product_details_timed(content, product_url)
+    for stage, seconds in timings.items():
+        metrics.observe(stage, seconds)
+    return product_data
+
 def get_product_details(product_url, timeout=3):
     """Ürün sayfasından detayları çeker"""
     try:
-        response = requests.get(product_url, headers=HEADERS, timeout=timeout)
+        response = http_client.get_until(product_url, PRODUCT_PAGE_COMPLETE_PATTERNS, timeout=timeout)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        product_data = {
-            'product_id': None,
-            'product_name': None,
-            'price': None,
-            'category': None,
-            'brand': None,
-            'description': None,
-            'images': [],
-            'ean': None
-        }
-        
-        # Ürün adı - önce .name span'ından al
-        name_elem = soup.select_one('.name')
-        if name_elem:
-            product_data['product_name'] = name_elem.get_text(strip=True)
-        else:
-            # Alternatif seçiciler
-            name_selectors = [
-                'h1.product-title',
-                'h1.product-name',
-                '.product-title',
-                'h1',
-                '[class*="product"][class*="name"]',
-                '[class*="product"][class*="title"]'
-            ]
-            for selector in name_selectors:
-                name_elem = soup.select_one(selector)
-                if name_elem:
-                    product_data['product_name'] = name_elem.get_text(strip=True)
-                    break
-        
-        # Fiyat - TechnoMarket özel yapısı
-        # <div class="price"><tm-price> içinde <span class="bgn"><span class="primary">1,099</span><span class="secondary">00</span></span>
-        price_elem = soup.select_one('.price tm-price .bgn')
-        if price_elem:
-            # primary ve secondary span'larını bul
-            primary = price_elem.select_one('.primary')
-            secondary = price_elem.select_one('.secondary')
-            
-            if primary:
-                primary_text = primary.get_text(strip=True)
-                secondary_text = secondary.get_text(strip=True) if secondary else '00'
-                
-                # Binlik ayıracı (virgül) ve boşlukları temizle
-                primary_text = primary_text.replace(',', '').replace(' ', '').strip()
-                secondary_text = secondary_text.replace(',', '').replace(' ', '').strip()
-                
-                # Fiyatı birleştir (1099.00 gibi)
-                price_text = f"{primary_text}.{secondary_text}"
-                product_data['price'] = extract_price(price_text)
-        
-        # Eğer yukarıdaki yapı çalışmadıysa, genel yöntemi dene
-        if not product_data['price']:
-            price_selectors = [
-                '.price',
-                '.product-price',
-                '[class*="price"]',
-                '[data-price]'
-            ]
-            for selector in price_selectors:
-                price_elem = soup.select_one(selector)
-                if price_elem:
-                    price_text = price_elem.get_text(strip=True)
-                    product_data['price'] = extract_price(price_text)
-                    if product_data['price']:
-                        break
-        
-        # EAN/Barkod - tm-pointandplace elementinin ean attribute'ünden al
-        pointandplace = soup.select_one('tm-pointandplace')
-        if pointandplace:
-            ean = pointandplace.get('ean')
-            if ean:
-                product_data['ean'] = ean.strip()
-        
-        # Eğer tm-pointandplace'den bulunamadıysa, alternatif yöntemleri dene
-        if not product_data['ean']:
-            ean_patterns = [
-                r'EAN[:\s]*(\d+)',
-                r'Barkod[:\s]*(\d+)',
-                r'Код на продукта[:\s]*(\d+)'
-            ]
-            for pattern in ean_patterns:
-                match = re.search(pattern, soup.get_text(), re.IGNORECASE)
-                if match:
-                    product_data['ean'] = match.group(1)
-                    break
-        
-        # Ürün ID - Şu an EAN olarak bulunan değeri kullan (Код на продукта)
-        # Eğer bulunamazsa URL'den al
-        product_code_patterns = [
-            r'Код на продукта[:\s]*(\d+)',
-            r'Код[:\s]*(\d+)',
-        ]
-        for pattern in product_code_patterns:
-            match = re.search(pattern, soup.get_text(), re.IGNORECASE)
-            if match:
-                product_data['product_id'] = match.group(1)
-                break
-        
-        # Eğer hala bulunamadıysa URL'den al
-        if not product_data['product_id']:
-            url_match = re.search(r'/p/(\d+)|/product/(\d+)|product-(\d+)|/(\d{8})$', product_url)
-            if url_match:
-                product_data['product_id'] = url_match.group(1) or url_match.group(2) or url_match.group(3) or url_match.group(4)
-        
-        # Marka - önce data-brand attribute'ünden al (çeviri yok)
-        brand_elem = soup.select_one('[data-brand]')
-        if brand_elem:
-            product_data['brand'] = brand_elem.get('data-brand', '').strip()
-        
-        # Eğer data-brand bulunamadıysa, diğer yöntemleri dene
-        if not product_data['brand']:
-            brand_selectors = [
-                '[class*="brand"]',
-                '.product-brand'
-            ]
-            for selector in brand_selectors:
-                brand_elem = soup.select_one(selector)
-                if brand_elem:
-                    product_data['brand'] = brand_elem.get_text(strip=True)
+        return parse_product_details(response.content, product_url)
+    
+    except Exception as e:
+        print(f"  Hata: {str(e)}")
+        return None
+
+def parse_product_soup(soup, product_url):
+    """Parse edilmiş ürün sayfasından detayları çıkarır (EXTRACTION_SPEC sırasıyla)"""
+    matches = PageMatches(soup)
+    
+    product_data = {
+        'product_id': None,
+        'product_name': None,
+        'price': None,
+        'category': None,
+        'brand': None,
+        'description': None,
+        'images': [],
+        'ean': None
+    }
+    
+    # Ürün adı - önce .name span'ı, sonra alternatif seçiciler
+    name_elem = matches.get('name')
+    if name_elem is None:
+        name_elem = next((elem for elem in matches.fallbacks('name') if elem is not None), None)
+    if name_elem is not None:
+        product_data['product_name'] = name_elem.get_text(strip=True)
+    
+    # Fiyat - TechnoMarket özel yapısı
+    # <div class="price"><tm-price> içinde <span class="bgn"><span class="primary">1,099</span><span class="secondary">00</span></span>
+    price_elem = matches.get('price')
+    if price_elem is not None:
+        product_data['price'] = parse_bgn_price(price_elem)
+    
+    # Eğer yukarıdaki yapı çalışmadıysa, genel yöntemi dene
+    if not product_data['price']:
+        for price_elem in matches.fallbacks('price'):
+            if price_elem is not None:
+                product_data['price'] = extract_price(price_elem.get_text(strip=True))
+                if product_data['price']:
                     break
-        
-        # Kategori - önce data-category attribute'ünden al
-        category_elem = soup.select_one('[data-category]')
-        if category_elem:
-            category_value = category_elem.get('data-category', '').strip()
-            if category_value:
-                # Category formatı: "ТВ, Аудио и Електроника|Телевизори|32 "_ 42 ""
-                # Tüm kategori hiyerarşisini " > " ile birleştir
-                category_parts = [part.strip() for part in category_value.split('|') if part.strip()]
-                if category_parts:
-                    # Tüm kategorileri " > " ile birleştir
-                    product_data['category'] = ' > '.join(category_parts)
-                else:
-                    product_data['category'] = category_value
-        
-        # Eğer data-category bulunamadıysa, alternatif yöntemleri dene
-        if not product_data['category']:
-            category_selectors = [
-                '.breadcrumb a',
-                '[class*="breadcrumb"] a',
-                '[class*="category"]'
-            ]
-            for selector in category_selectors:
-                cat_elems = soup.select(selector)
-                if cat_elems:
-                    product_data['category'] = cat_elems[-1].get_text(strip=True)
+    
+    # Doküman metni sadece bir kez üretilir; tüm kod regex'leri tek geçişte aranır
+    codes = search_product_codes(soup.get_text())
+    
+    # EAN/Barkod - tm-pointandplace elementinin ean attribute'ünden al
+    pointandplace = matches.get('ean')
+    if pointandplace is not None and pointandplace.get('ean'):
+        product_data['ean'] = pointandplace.get('ean').strip()
+    
+    # Eğer tm-pointandplace'den bulunamadıysa metindeki etiketlere bak (öncelik: EAN, Barkod, Код на продукта)
+    if not product_data['ean']:
+        product_data['ean'] = codes.get('ean') or codes.get('barkod') or codes.get('product_code')
+    
+    # Ürün ID - Код на продукта, yoksa Код; bulunamazsa URL'den al
+    product_data['product_id'] = codes.get('product_code') or codes.get('code')
+    if not product_data['product_id']:
+        url_match = PRODUCT_URL_ID_PATTERN.search(product_url)
+        if url_match:
+            product_data['product_id'] = url_match.group(1) or url_match.group(2) or url_match.group(3) or url_match.group(4)
+    
+    # Marka - önce data-brand attribute'ünden al (çeviri yok)
+    brand_elem = matches.get('brand')
+    if brand_elem is not None:
+        product_data['brand'] = brand_elem.get('data-brand', '').strip()
+    
+    # Eğer data-brand bulunamadıysa, diğer yöntemleri dene
+    if not product_data['brand']:
+        brand_elem = next((elem for elem in matches.fallbacks('brand') if elem is not None), None)
+        if brand_elem is not None:
+            product_data['brand'] = brand_elem.get_text(strip=True)
+    
+    # Kategori - önce data-category attribute'ünden al
+    category_elem = matches.get('category')
+    if category_elem is not None:
+        category_value = category_elem.get('data-category', '').strip()
+        if category_value:
+            # Category formatı: "ТВ, Аудио и Електроника|Телевизори|32 "_ 42 ""
+            # Tüm kategori hiyerarşisini " > " ile birleştir
+            category_parts = [part.strip() for part in category_value.split('|') if part.strip()]
+            product_data['category'] = CATEGORY_SEPARATOR.join(category_parts) if category_parts else category_value
+    
+    # Eğer data-category bulunamadıysa, alternatif yöntemleri dene
+    if not product_data['category']:
+        cat_elems = next((elems for elems in matches.fallbacks('category') if elems), None)
+        if cat_elems:
+            product_data['category'] = cat_elems[-1].get_text(strip=True)
+    
+    # Açıklama - .collapsed-content .product-basic ul li elementlerinden
+    desc_items = []
+    for li in matches.get('description'):
+        # İkon metnini temizle (✓ işaretini kaldır)
+        text = LEADING_SYMBOLS_PATTERN.sub('', li.get_text(strip=True))
+        if text:
+            desc_items.append(text)
+    
+    # Eğer bulunamadıysa alternatif yöntemleri dene
+    if not desc_items:
+        for desc_elem in matches.fallbacks('description'):
+            if desc_elem is not None:
+                desc_text = desc_elem.get_text(strip=True)
+                if desc_text:
+                    desc_items.append(desc_text)
                     break
-        
-        # Açıklama - .collapsed-content .product-basic ul li elementlerinden
-        desc_items = []
-        
-        # Önce .collapsed-content .product-basic ul li'den çek
-        basic_info = soup.select('.collapsed-content .product-basic ul li')
-        if basic_info:
-            for li in basic_info:
-                text = li.get_text(strip=True)
-                if text:
-                    # İkon metnini temizle (✓ işaretini kaldır)
-                    text = re.sub(r'^[^\w]*', '', text)
-                    if text:
-                        desc_items.append(text)
-        
-        # Eğer bulunamadıysa alternatif yöntemleri dene
-        if not desc_items:
-            desc_selectors = [
-                '.product-description',
-                '[class*="description"]',
-                '.product-details'
-            ]
-            for selector in desc_selectors:
-                desc_elem = soup.select_one(selector)
-                if desc_elem:
-                    desc_text = desc_elem.get_text(strip=True)
-                    if desc_text:
-                        desc_items.append(desc_text)
-                        break
-        
-        # Açıklamaları birleştir (satır başı ile)
-        if desc_items:
-            product_data['description'] = '\n'.join(desc_items)
-        else:
-            product_data['description'] = ''
-        
-        # Görseller - .slider-content içinden çek
-        slider_content = soup.select_one('.slider-content')
-        if slider_content:
-            imgs = slider_content.find_all('img')
+    
+    # Açıklamaları birleştir (satır başı ile)
+    product_data['description'] = DESCRIPTION_SEPARATOR.join(desc_items)
+    
+    # Görseller - .slider-content içinden çek
+    slider_content = matches.get('images')
+    if slider_content is not None:
+        for img in slider_content.find_all('img'):
+            # Önce src, sonra data-src'yi kontrol et
+            img_url = img.get('src') or img.get('data-src')
+            if img_url:
+                img_url = normalize_product_image_url(img_url)
+                # Tekrarları önle
+                if img_url not in product_data['images']:
+                    product_data['images'].append(img_url)
+    
+    # Eğer slider-content'ten görsel bulunamadıysa, alternatif yöntemleri dene
+    if not product_data['images']:
+        for imgs in matches.fallbacks('images'):
             for img in imgs:
-                # Önce src, sonra data-src'yi kontrol et
-                img_url = img.get('src') or img.get('data-src')
+                img_url = img.get('src') or img.get('data-src') or img.get('data-zoom-url') or img.get('data-large-url')
                 if img_url:
-                    # URL'yi normalize et
-                    if img_url.startswith('//'):
-                        img_url = f"https:{img_url}"
-                    elif img_url.startswith('/'):
-                        img_url = urljoin(BASE_URL, img_url)
-                    
-                    # Tekrarları önle
-                    if img_url and img_url not in product_data['images']:
+                    img_url = normalize_product_image_url(img_url)
+                    if img_url not in product_data['images']:
                         product_data['images'].append(img_url)
-        
-        # Eğer slider-content'ten görsel bulunamadıysa, alternatif yöntemleri dene
-        if not product_data['images']:
-            img_selectors = [
-                '.product-gallery img',
-                '.product-images img',
-                '[class*="product"] img[src]',
-                'img[data-zoom-url]',
-                'img[data-large-url]'
-            ]
-            for selector in img_selectors:
-                imgs = soup.select(selector)
-                for img in imgs:
-                    img_url = img.get('src') or img.get('data-src') or img.get('data-zoom-url') or img.get('data-large-url')
-                    if img_url:
-                        if img_url.startswith('//'):
-                            img_url = f"https:{img_url}"
-                        elif img_url.startswith('/'):
-                            img_url = urljoin(BASE_URL, img_url)
-                        if img_url not in product_data['images']:
-                            product_data['images'].append(img_url)
-                if product_data['images']:
-                    break
-        
-        return product_data
+            if product_data['images']:
+                break
     
-    except Exception as e:
-        print(f"  Hata: {str(e)}")
-        return None
+    return product_data
 
 def get_category_products(category_url, max_products=100):
     """Kategori sayfasından ürün URL'lerini çıkarır"""
@@ -315,12 +462,12 @@ def get_category_products(category_url, max_products=100):
             else:
                 page_url = f"{category_url}?page={page}"
             
-            response = requests.get(page_url, headers=HEADERS, timeout=10)
+            response = http_client.get(page_url, timeout=10)
             
             if response.status_code != 200:
                 break
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = html_parser.make_soup(response.content, 'grid')
             
             # Ürün linklerini bul
             product_links = soup.find_all('a', href=re.compile(r'/p/|/product/'))
@@ -346,7 +493,6 @@ def get_category_products(category_url, max_products=100):
                 break
             
             page += 1
-            time.sleep(DELAY)
         
         return products[:max_products]
     
@@ -354,8 +500,8 @@ def get_category_products(category_url, max_products=100):
         print(f"Hata: {str(e)}")
         return []
 
-def create_excel_template():
-    """Excel şablonunu oluşturur"""
+def create_excel_template(store):
+    """Boş veri setini (şablon sütunlarıyla) depoya yazar ve döndürür"""
     columns = [
         'Product ID',
         'Barkod (EAN Number)',
@@ -375,15 +521,17 @@ def create_excel_template():
     ]
     
     df = pd.DataFrame(columns=columns)
-    df.to_excel(EXCEL_FILE, index=False)
-    print(f"✅ Excel şablonu oluşturuldu: {EXCEL_FILE}")
+    store.save(df)
+    print(f"✅ Veri seti şablonu oluşturuldu: {store.data_path}")
+    return df
 
 def main():
     print("TechnoMarket.bg Ürün Çekme Scripti")
     print("="*60)
     
-    # Excel dosyasını oluştur
-    create_excel_template()
+    # Veri setini oluştur
+    store = DatasetStore(DATASET, EXCEL_FILE)
+    template = create_excel_template(store)
     
     # Kullanıcıdan kategori seçimi
     print("\nKategori URL'lerini girin (her satıra bir URL, boş satır ile bitirin):")
@@ -403,8 +551,8 @@ def main():
     
     print(f"\n✅ {len(category_urls)} kategori işlenecek")
     
-    # Excel dosyasını oku
-    df = pd.read_excel(EXCEL_FILE)
+    # Satırlar sütun listelerinde biriktirilir
+    rows = RowBuffer.from_frame(template)
     
     # İstatistikler
     total_products = 0
@@ -429,7 +577,6 @@ def main():
             if not product_data:
                 print(f"    ✗ Ürün bilgileri çekilemedi")
                 stats['failed'] += 1
-                time.sleep(DELAY)
                 continue
             
             # Yeni satır oluştur
@@ -439,7 +586,7 @@ def main():
                 'Product Name': translate_text(product_data.get('product_name', '')),
                 'Price': product_data.get('price'),
                 'Currency': 'BGN',
-                'Category': translate_text(product_data.get('category', '')),
+                'Category': translate_category(product_data.get('category', '')),
                 'Brand': translate_text(product_data.get('brand', '')),
                 'Product URL': product_url,
                 'Ana görsel': product_data['images'][0] if product_data['images'] else '',
@@ -451,7 +598,7 @@ def main():
                 'Diğer görseller': ', '.join(product_data['images'][6:]) if len(product_data['images']) > 6 else ''
             }
             
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
+            rows.append(new_row)
             total_products += 1
             stats['success'] += 1
             
@@ -460,14 +607,13 @@ def main():
             # Her 10 üründe bir kaydet
             if total_products % 10 == 0:
                 print(f"\n💾 İlerleme kaydediliyor... ({total_products} ürün)")
-                df.to_excel(EXCEL_FILE, index=False)
-            
-            time.sleep(DELAY)
+                store.save(rows.to_frame())
     
     # Son kayıt
-    print("\n💾 Excel dosyası güncelleniyor...")
-    df.to_excel(EXCEL_FILE, index=False)
-    print(f"✅ Excel dosyası güncellendi: {EXCEL_FILE}")
+    print("\n💾 Veri deposu güncelleniyor...")
+    store.save(rows.to_frame())
+    print(f"✅ Veri deposu güncellendi: {store.data_path}")
+    print(f"   (xlsx için: python export_xlsx.py {DATASET})")
     
     # Özet
     print("\n" + "="*60)
@@ -476,6 +622,10 @@ def main():
     print(f"Başarılı: {stats['success']}")
     print(f"Başarısız: {stats['failed']}")
     print(f"Toplam: {total_products}")
+    print(f"HTTP: {http_client.format_metrics()}")
+    print(f"Çeviri: {get_default_memory().format_stats()}")
+    if get_default_worker() is not None:
+        print(f"Çeviri istekleri: {get_default_worker().format_stats()}")
 
 if __name__ == '__main__':
     main()
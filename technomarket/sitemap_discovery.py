@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TechnoMarket.bg ürün linklerini sitemap'lerden çıkaran script
+
+Grid sayfalarını tek tek gezmek yerine robots.txt'deki Sitemap satırlarından
+sitemap index'i, oradan da iç içe ürün sitemap'lerini okur. Sitemap'ler akış
+halinde (iterparse) işlenir, .xml.gz dosyaları da desteklenir; birkaç istekle
+tüm ürün URL'leri lastmod tarihleriyle birlikte ürün linkleri veri setine
+(technomarket_urls) yazılır.
+
+Kullanım:
+    python sitemap_discovery.py [BASE_URL]
+BASE_URL verilmezse TECHNOMARKET_BASE_URL ortam değişkeni, o da yoksa
+https://www.technomarket.bg kullanılır (yerel test sunucusu için).
+"""
+
+import os
+import sys
+import xml.etree.ElementTree as ET
+import zlib
+from urllib.parse import urljoin
+
+import pandas as pd
+
+# Ortak modüller (common/) depo kökünde
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import http_client
+from common.dataset_store import DatasetStore
+from extract_product_urls import COLUMNS, DATASET, EXCEL_FILE, is_product_url
+
+# Ayarlar
+BASE_URL = os.environ.get('TECHNOMARKET_BASE_URL', 'https://www.technomarket.bg')
+PRODUCT_SITEMAP_KEYWORD = 'product'  # Index'te bu kelimeyi içeren sitemap'ler varsa sadece onlar okunur
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+GZIP_MAGIC = b'\x1f\x8b'
+CHUNK_SIZE = 64 * 1024
+
+
+def sitemaps_from_robots(base_url):
+    """robots.txt'deki Sitemap: satırları (yoksa /sitemap.xml)"""
+    robots_url = urljoin(base_url, '/robots.txt')
+    sitemaps = []
+    try:
+        response = http_client.get(robots_url, timeout=10, use_cache=False)
+        response.raise_for_status()
+        for line in response.text.splitlines():
+            key, _, value = line.partition(':')
+            if key.strip().lower() == 'sitemap' and value.strip():
+                sitemaps.append(urljoin(base_url, value.strip()))
+    except Exception as e:
+        print(f"  ⚠️  robots.txt okunamadı: {str(e)}")
+    return sitemaps or [urljoin(base_url, '/sitemap.xml')]
+
+
+def iter_sitemap(sitemap_url):
+    """Sitemap'i akış halinde okur: (tür, loc, lastmod) üretir
+
+    tür 'sitemap' (index içindeki alt sitemap) veya 'url' (sayfa) olur. Gövde
+    parça parça XMLPullParser'a verilir, tamamı belleğe alınmaz; gzip'li
+    dosyalar (.xml.gz) ilk iki bayttan tanınıp akış halinde açılır.
+    """
+    response = http_client.stream(sitemap_url)
+    try:
+        response.raise_for_status()
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        decompressor = None
+        root = None
+        loc = lastmod = None
+        for index, chunk in enumerate(response.iter_content(chunk_size=CHUNK_SIZE)):
+            if index == 0 and chunk[:2] == GZIP_MAGIC:
+                decompressor = zlib.decompressobj(wbits=31)
+            parser.feed(decompressor.decompress(chunk) if decompressor else chunk)
+            for event, elem in parser.read_events():
+                if root is None:
+                    root = elem
+                if event == 'start':
+                    continue
+                tag = elem.tag.replace(SITEMAP_NS, '')
+                if tag == 'loc':
+                    loc = (elem.text or '').strip()
+                elif tag == 'lastmod':
+                    lastmod = (elem.text or '').strip() or None
+                elif tag in ('sitemap', 'url'):
+                    if loc:
+                        yield tag, loc, lastmod
+                    loc = lastmod = None
+                    root.clear()  # İşlenen girdiler bellekte birikmesin
+        parser.close()
+    finally:
+        response.close()
+
+
+def discover_products(base_url=BASE_URL):
+    """robots.txt -> sitemap index -> ürün sitemap'leri; URL -> lastmod döndürür"""
+    products = {}
+    queue = sitemaps_from_robots(base_url)
+    seen = set()
+    requests_made = 1
+    while queue:
+        sitemap_url = queue.pop(0)
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+        print(f"Sitemap okunuyor: {sitemap_url}")
+        requests_made += 1
+
+        nested = []
+        found = 0
+        try:
+            for kind, loc, lastmod in iter_sitemap(sitemap_url):
+                if kind == 'sitemap':
+                    nested.append(loc)
+                elif is_product_url(loc):
+                    products[loc] = lastmod
+                    found += 1
+        except Exception as e:
+            print(f"  ✗ Hata: {str(e)}")
+            continue
+
+        if nested:
+            # Index'te ürün sitemap'leri ayrıysa kategori / sayfa sitemap'leri atlanır
+            product_sitemaps = [url for url in nested if PRODUCT_SITEMAP_KEYWORD in url.lower()]
+            queue.extend(product_sitemaps or nested)
+            print(f"  ✅ {len(product_sitemaps or nested)}/{len(nested)} alt sitemap okunacak")
+        else:
+            print(f"  ✅ {found} ürün linki bulundu")
+    return products, requests_made
+
+
+def main():
+    base_url = sys.argv[1] if len(sys.argv) > 1 else BASE_URL
+    print("TechnoMarket.bg Sitemap Ürün Keşfi")
+    print("="*60)
+    print(f"Site: {base_url}")
+
+    # Mevcut veri setini oku (varsa): grid'den gelen ad / marka / fiyat korunur
+    store = DatasetStore(DATASET, EXCEL_FILE)
+    records = {}
+    if store.exists() or os.path.exists(EXCEL_FILE):
+        try:
+            existing_df = store.load()
+            if 'Product URL' in existing_df.columns:
+                for record in existing_df.reindex(columns=COLUMNS).to_dict('records'):
+                    url = str(record['Product URL']).strip() if pd.notna(record['Product URL']) else ''
+                    if url:
+                        record['Product URL'] = url
+                        records[url] = {k: (None if pd.isna(v) else v) for k, v in record.items()}
+                print(f"\n📂 {len(records)} mevcut ürün linki yüklendi ({DATASET})")
+        except Exception as e:
+            print(f"  ⚠️  Mevcut dosya okunamadı: {str(e)}")
+    existing_count = len(records)
+
+    print("-" * 60)
+    products, requests_made = discover_products(base_url)
+    if not products:
+        print("⚠️  Sitemap'lerde ürün bulunamadı!")
+        return
+
+    changed = 0
+    for url, lastmod in products.items():
+        record = records.setdefault(url, {column: None for column in COLUMNS})
+        record['Product URL'] = url
+        if record['Lastmod'] != lastmod:
+            changed += 1
+        record['Lastmod'] = lastmod
+
+    print("\n💾 Veri setine kaydediliyor...")
+    df = pd.DataFrame(list(records.values()), columns=COLUMNS)
+    store.save(df)
+    print(f"✅ Ürün linkleri kaydedildi: {store.data_path}")
+
+    # Özet
+    print("\n" + "="*60)
+    print("ÖZET")
+    print("="*60)
+    print(f"Sitemap'teki ürün sayısı: {len(products)}")
+    print(f"  - Yeni eklenen: {len(records) - existing_count}")
+    print(f"  - lastmod değişen / yeni: {changed}")
+    print(f"İstek sayısı: {requests_made} (robots.txt dahil)")
+    print(f"HTTP: {http_client.format_metrics()}")
+    print(f"Veri seti: {store.data_path} (xlsx için: python export_xlsx.py {DATASET})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+sitemap_discovery.py için yerel test sunucusu ile uçtan uca test
+
+http.server localhost'ta robots.txt, sitemap index'i ve gzip'li iç içe ürün
+sitemap'ini sunar; bulunan URL -> lastmod eşlemesi ve istek sayısı kontrol edilir.
+
+Çalıştırma: python -m pytest tests  (veya python -m unittest discover tests)
+"""
+
+import gzip
+import os
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'technomarket'))
+
+import sitemap_discovery  # noqa: E402
+
+SITE = 'https://www.technomarket.bg'
+PRODUCTS = {
+    f'{SITE}/televizor/neo-led-32h3m-hd-led-tv-09218598': '2026-01-05',
+    f'{SITE}/hladilnik/beko-rcsa-270-09100001': '2026-01-06',
+    f'{SITE}/pechka/gorenje-ec-5111-09100002': None,
+}
+NON_PRODUCTS = [
+    f'{SITE}/produkti/televizor',
+    f'{SITE}/files/manual-1.pdf',
+    f'{SITE}/magazini',
+    f'{SITE}/blog/kak-da-izberem-televizor',
+    f'{SITE}/za-nas/uslovia',
+]
+
+
+def urlset(urls):
+    entries = []
+    for url, lastmod in urls:
+        lastmod_tag = f'<lastmod>{lastmod}</lastmod>' if lastmod else ''
+        entries.append(f'<url><loc>{url}</loc>{lastmod_tag}</url>')
+    return ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + ''.join(entries) + '</urlset>').encode('utf-8')
+
+
+def sitemap_index(urls):
+    entries = ''.join(f'<sitemap><loc>{url}</loc></sitemap>' for url in urls)
+    return ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + entries + '</sitemapindex>').encode('utf-8')
+
+
+class SitemapServer:
+    """Yolu -> gövde sözlüğünü sunan yerel HTTP sunucusu (istenen yolları kaydeder)"""
+
+    def __init__(self):
+        self.pages = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests.append(self.path)
+                body = server.pages.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class SitemapDiscoveryTest(unittest.TestCase):
+
+    def discover(self, server):
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                return sitemap_discovery.discover_products(server.base_url)
+            finally:
+                sys.stdout = stdout
+
+    def test_index_with_gzipped_product_sitemap(self):
+        with SitemapServer() as server:
+            base = server.base_url
+            server.pages['/robots.txt'] = f'User-agent: *\nDisallow: /cart\nSitemap: {base}/sitemap.xml\n'.encode()
+            server.pages['/sitemap.xml'] = sitemap_index([f'{base}/sitemap-products.xml.gz',
+                                                         f'{base}/sitemap-pages.xml'])
+            server.pages['/sitemap-products.xml.gz'] = gzip.compress(
+                urlset(list(PRODUCTS.items()) + [(url, '2026-01-01') for url in NON_PRODUCTS]))
+            server.pages['/sitemap-pages.xml'] = urlset([(f'{SITE}/magazini', None)])
+
+            products, requests_made = self.discover(server)
+
+        self.assertEqual(products, PRODUCTS)
+        # robots.txt + index + ürün sitemap'i (sayfa sitemap'i atlanır)
+        self.assertEqual(requests_made, 3)
+        self.assertEqual(server.requests, ['/robots.txt', '/sitemap.xml', '/sitemap-products.xml.gz'])
+
+    def test_flat_sitemap_keeps_only_product_pages(self):
+        with SitemapServer() as server:
+            # robots.txt yok: /sitemap.xml denenir
+            server.pages['/sitemap.xml'] = urlset(
+                [(url, None) for url in NON_PRODUCTS] + list(PRODUCTS.items()))
+
+            products, requests_made = self.discover(server)
+
+        self.assertEqual(products, PRODUCTS)
+        self.assertEqual(requests_made, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,13 +6,17 @@ Tüm ürün fiyatlarına 1000 TL ekleyen script
 
 import pandas as pd
 
+from common.dataset_store import DatasetStore
+
 # Ayarlar
 EXCEL_FILE = 'Technopolis_Tum_Urunler_20250917_164841_Brands_Translated_NoDuplicates (1).xlsx'
+DATASET = 'technopolis'  # Veri deposundaki adı (xlsx sadece export_xlsx.py ile üretilir)
 PRICE_INCREMENT = 1000  # Eklenecek tutar (TL)
 
 def main():
-    print("Excel dosyası okunuyor...")
-    df = pd.read_excel(EXCEL_FILE)
+    print("Veri deposu okunuyor...")
+    store = DatasetStore(DATASET, EXCEL_FILE)
+    df = store.load()
     
     # Price sütununu kontrol et
     price_col = 'Price'
@@ -55,11 +59,12 @@ def main():
         if pd.notna(price):
             print(f"  {product_name}... : {price:.2f} TL")
     
-    # Excel dosyasını güncelle
-    print(f"\n💾 Excel dosyası güncelleniyor...")
-    df.to_excel(EXCEL_FILE, index=False)
+    # Veri deposunu güncelle
+    print(f"\n💾 Veri deposu güncelleniyor...")
+    store.save(df)
     print(f"✅ Tüm fiyatlara {PRICE_INCREMENT} TL eklendi!")
-    print(f"✅ Excel dosyası güncellendi: {EXCEL_FILE}")
+    print(f"✅ Veri deposu güncellendi: {store.data_path}")
+    print(f"   (xlsx için: python export_xlsx.py {DATASET})")
 
 if __name__ == '__main__':
     main()